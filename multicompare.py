@@ -1,5 +1,6 @@
 import sys
 import os
+import multiprocessing
 
 # 1. Add the current directory to Python's path
 # This ensures Python can find the 'src' folder no matter how you launch this file.
@@ -23,4 +24,6 @@ except ImportError as e:
 
 # 3. Run it
 if __name__ == "__main__":
+    # Needed by the analysis/export process pools in frozen (Nuitka) builds
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -0,0 +1,82 @@
+"""
+Benchmark: file matching with and without key rules.
+
+Creates N empty image files spread over a few folders (ComfyUI-style names
+with counters and edit suffixes), then times FileScanner.scan plain and with
+rules, plus KeyIndex lookups.
+
+Usage: python scripts/bench_matching.py [num_files] [num_folders]
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(script_dir))
+
+from src.logic import FileScanner, KeyRules, KeyIndex
+
+RULES = ["counters", "strip:_edit", r"regex:^(.*?)_v\d+$"]
+REPEATS = 3
+
+
+def make_tree(root, num_files, num_folders):
+    folders = []
+    for i in range(num_folders):
+        path = os.path.join(root, f"run_{i}")
+        os.mkdir(path)
+        folders.append(path)
+
+    subjects = num_files // num_folders
+    for i in range(num_files):
+        folder = folders[i % num_folders]
+        subject = f"subject_{(i // num_folders) % subjects:06d}"
+        variant = random.choice(["_{:05d}_".format(i), "_edit", "_v{}".format(i % 7), ""])
+        open(os.path.join(folder, f"{subject}{variant}.png"), "w").close()
+    return folders
+
+
+def best_of(fn):
+    best = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    num_files = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    num_folders = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    random.seed(1)
+
+    with tempfile.TemporaryDirectory() as root:
+        print(f"Creating {num_files:,} files in {num_folders} folders...")
+        folders = make_tree(root, num_files, num_folders)
+
+        t_plain, plain = best_of(lambda: FileScanner.scan(folders))
+        rules = KeyRules(RULES)
+        t_rules, ruled = best_of(lambda: FileScanner.scan(folders, rules))
+
+        print(f"\nScan, plain names : {t_plain * 1000:8.1f} ms  ({len(plain[0]):,} sets)")
+        print(f"Scan, with rules  : {t_rules * 1000:8.1f} ms  ({len(ruled[0]):,} sets)")
+        print(f"Rule overhead     : {(t_rules - t_plain) / num_files * 1e6:8.2f} us / file")
+
+        stems = [os.path.splitext(f)[0].lower() for f in os.listdir(folders[0])] * num_folders
+        t_keys, _ = best_of(lambda: rules.apply(stems))
+        print(f"Key extraction    : {len(stems) / t_keys:,.0f} names / s")
+
+        t_build, index = best_of(lambda: KeyIndex(ruled[1]))
+        queries = random.sample(ruled[1], min(1000, len(ruled[1])))
+        t_prefix, _ = best_of(lambda: [index.prefix(q[:10]) for q in queries])
+        t_fuzzy, _ = best_of(lambda: [index.find(q[:-1] + "x") for q in queries[:100]])
+        print(f"KeyIndex build    : {t_build * 1000:8.1f} ms")
+        print(f"Prefix lookup     : {t_prefix / len(queries) * 1e6:8.1f} us / query")
+        print(f"Fuzzy lookup      : {t_fuzzy / 100 * 1e3:8.2f} ms / query")
+
+
+if __name__ == "__main__":
+    main()
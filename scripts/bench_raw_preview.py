@@ -0,0 +1,115 @@
+"""
+Benchmark: memory and time to turn a RAW file into a viewer preview.
+
+  old - full 8-bit postprocess, Image.fromarray, LANCZOS resize to 2500 px
+  new - half-size 16-bit postprocess, rgb16_preview (box filter into reused
+        buffers, zero-copy Image.frombuffer, one resize to 2500 px)
+
+Both produce the same preview size, so the numbers compare equal output.
+
+Each variant runs in a fresh process, so peak RSS is its own. tracemalloc
+sees the NumPy allocations (PIL's own memory only shows up in RSS).
+
+With RAW files as arguments the real decoders are used. Without, the
+demosaic step is simulated by allocating the array postprocess would
+return for a SENSOR-sized image, so only the stages after it are compared.
+
+Usage: python scripts/bench_raw_preview.py [file.ARW ...]
+"""
+import os
+import sys
+import time
+import tracemalloc
+import multiprocessing
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(script_dir))
+
+import numpy as np
+from PIL import Image
+
+from src.pipeline import decode_buffer, decode_raw_preview, make_preview, read_buffer, rgb16_preview
+
+PREVIEW_SIDE = 2500
+SENSOR = (6000, 4000)      # Simulated sensor (w, h): 24 MP
+REPEATS = 5
+
+try:
+    import resource
+except ImportError:        # Windows
+    resource = None
+
+
+def peak_rss_mb():
+    if resource is None:
+        return float("nan")
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def old_synthetic(_):
+    w, h = SENSOR
+    rgb = np.empty((h, w, 3), dtype=np.uint8)          # postprocess(), 8 bit
+    rgb.fill(128)
+    return make_preview(Image.fromarray(rgb), PREVIEW_SIDE)
+
+
+def new_synthetic(_):
+    w, h = SENSOR
+    rgb = np.empty((h // 2, w // 2, 3), dtype=np.uint16)   # postprocess(half_size, 16 bit)
+    rgb.fill(32768)
+    return rgb16_preview(rgb, PREVIEW_SIDE)
+
+
+def old_file(path):
+    buf = read_buffer(path)
+    try:
+        return make_preview(decode_buffer(path, buf), PREVIEW_SIDE)
+    finally:
+        buf.close()
+
+
+def new_file(path):
+    buf = read_buffer(path)
+    try:
+        return decode_raw_preview(buf, PREVIEW_SIDE)
+    finally:
+        buf.close()
+
+
+def run(variant, inputs):
+    """Child process: returns (seconds per image, peak RSS growth MB, tracemalloc peak MB, preview size)."""
+    fn = globals()[variant]
+    rss_before = peak_rss_mb()
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        for item in inputs:
+            preview = fn(item)
+    elapsed = (time.perf_counter() - start) / (REPEATS * len(inputs))
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak_rss_mb() - rss_before, traced_peak / 1024 / 1024, preview.size
+
+
+def main():
+    files = sys.argv[1:]
+    if files:
+        variants, inputs = ("old_file", "new_file"), files
+        print(f"{len(files)} RAW file(s), {REPEATS} passes")
+    else:
+        variants, inputs = ("old_synthetic", "new_synthetic"), [None]
+        print(f"Simulated {SENSOR[0]}x{SENSOR[1]} sensor, {REPEATS} passes (demosaic not included)")
+
+    ctx = multiprocessing.get_context("spawn")
+    print(f"\n{'path':<5} {'ms / image':>11} {'peak RSS +MB':>13} {'numpy peak MB':>14}  preview")
+    for variant in variants:
+        with ctx.Pool(1) as pool:
+            elapsed, rss, traced, size = pool.apply(run, (variant, inputs))
+        print(f"{variant.split('_')[0]:<5} {elapsed * 1000:11.1f} {rss:13.1f} {traced:14.1f}  {size[0]}x{size[1]}")
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    main()
@@ -0,0 +1,150 @@
+import math
+from collections import namedtuple
+from concurrent.futures import as_completed
+
+import numpy as np
+from PIL import Image, ImageOps
+import rawpy
+
+# --- ROBUST IMPORT FOR LOGIC / JOBS ---
+try:
+    from src.logic import RAW_EXTS
+    from src.jobs import process_pool
+except ImportError:
+    from .logic import RAW_EXTS
+    from .jobs import process_pool
+
+ANALYSIS_SIDE = 1024       # Long side of the reduced decode that gets scored
+CLIP_HIGH = 250            # 8-bit levels counted as blown highlights
+CLIP_LOW = 5               # ... and as crushed shadows
+NOISE_WEIGHT = 0.05        # How much estimated noise costs in the combined score
+
+HIST_SIZE = (256, 80)      # Rendered histogram (w, h)
+
+Scores = namedtuple("Scores", "sharpness clip_high clip_low noise score")
+# Clipping mask palette (RGBA): 0 = untouched, 1 = blown highlights, 2 = crushed shadows
+MASK_PALETTE = (0, 0, 0, 0,  255, 0, 0, 170,  0, 90, 255, 170)
+
+# Per-image overlay: rendered RGBA histogram and a one-byte palette clipping mask the size of the preview
+Overlay = namedtuple("Overlay", "histogram mask")
+
+
+def load_gray(path, side=ANALYSIS_SIDE):
+    """Decodes a reduced-size grayscale version of a file as a float32 array."""
+    if path.lower().endswith(RAW_EXTS):
+        with rawpy.imread(path) as raw:
+            rgb = raw.postprocess(use_camera_wb=True, half_size=True)
+        img = Image.fromarray(rgb)
+    else:
+        img = Image.open(path)
+        # JPEG: let the decoder skip DCT detail we would throw away anyway
+        img.draft("L", (side, side))
+        img = ImageOps.exif_transpose(img)
+    img = img.convert("L")
+    img.thumbnail((side, side), Image.Resampling.BILINEAR)
+    return np.asarray(img, dtype=np.float32)
+
+
+def laplacian_variance(gray):
+    """Focus measure: variance of the 4-neighbour Laplacian."""
+    lap = (gray[1:-1, :-2] + gray[1:-1, 2:] + gray[:-2, 1:-1] + gray[2:, 1:-1]
+           - 4.0 * gray[1:-1, 1:-1])
+    return float(lap.var())
+
+
+def clipping(gray):
+    """Fractions of pixels at the top and bottom of the 8-bit range."""
+    n = gray.size
+    return float((gray >= CLIP_HIGH).sum()) / n, float((gray <= CLIP_LOW).sum()) / n
+
+
+def noise_sigma(gray):
+    """
+    Fast noise estimate (Immerkaer 1996): the response to a mask that
+    cancels out smooth image structure, averaged over the image.
+    """
+    h, w = gray.shape
+    if h < 3 or w < 3:
+        return 0.0
+    conv = (gray[:-2, :-2] - 2 * gray[:-2, 1:-1] + gray[:-2, 2:]
+            - 2 * gray[1:-1, :-2] + 4 * gray[1:-1, 1:-1] - 2 * gray[1:-1, 2:]
+            + gray[2:, :-2] - 2 * gray[2:, 1:-1] + gray[2:, 2:])
+    return float(np.abs(conv).sum() * math.sqrt(math.pi / 2) / (6.0 * (w - 2) * (h - 2)))
+
+
+def score_gray(gray):
+    sharpness = laplacian_variance(gray)
+    clip_high, clip_low = clipping(gray)
+    noise = noise_sigma(gray)
+    # Sharp wins; clipped areas and noise count against it
+    score = math.log1p(sharpness) * (1.0 - clip_high - clip_low) - NOISE_WEIGHT * noise
+    return Scores(sharpness, clip_high, clip_low, noise, score)
+
+
+def score_file(path):
+    return score_gray(load_gray(path))
+
+
+def _score_worker(path):
+    try:
+        return path, score_file(path)
+    except Exception as e:
+        print(f"[Analysis] Could not score {path}: {e}")
+        return path, None
+
+
+def score_files(paths, workers=None, on_progress=None):
+    """
+    Scores files across a process pool.
+    on_progress(done, total) is called as results come in.
+    Returns: {path: Scores} for every file that could be decoded.
+    """
+    results = {}
+    if not paths:
+        return results
+    with process_pool(workers) as pool:
+        futures = [pool.submit(_score_worker, p) for p in paths]
+        for done, future in enumerate(as_completed(futures), 1):
+            path, scores = future.result()
+            if scores is not None:
+                results[path] = scores
+            if on_progress:
+                on_progress(done, len(paths))
+    return results
+
+
+def clipping_mask(rgb):
+    """
+    Palette ("P") mask: red where any channel is blown, blue where all channels
+    are crushed. One byte per pixel; convert only the on-screen crop to RGBA.
+    """
+    mask = np.zeros(rgb.shape[:2], dtype=np.uint8)
+    mask[(rgb >= CLIP_HIGH).any(axis=2)] = 1
+    mask[(rgb <= CLIP_LOW).all(axis=2)] = 2
+    img = Image.fromarray(mask, "P")
+    img.putpalette(MASK_PALETTE, rawmode="RGBA")
+    return img
+
+
+def render_histogram(rgb, size=HIST_SIZE):
+    """Draws per-channel histograms (log scale) on a translucent background."""
+    w, h = size
+    out = np.zeros((h, 256, 4), dtype=np.uint8)
+    out[..., 3] = 150
+    rows = np.arange(h)[:, None]
+    for c in range(3):
+        counts = np.bincount(rgb[..., c].ravel(), minlength=256)[:256]
+        levels = np.log1p(counts.astype(np.float32))
+        top = levels.max() or 1.0
+        heights = (levels / top * h).astype(np.int32)
+        filled = rows >= (h - heights)[None, :]
+        out[..., c][filled] = 230
+    out[..., 3][out[..., :3].any(axis=2)] = 220
+    img = Image.fromarray(out, "RGBA")
+    return img if w == 256 else img.resize((w, h), Image.Resampling.NEAREST)
+
+
+def compute_overlay(preview):
+    """Histogram and clipping mask of a preview image (runs off the Tk thread)."""
+    rgb = np.asarray(preview.convert("RGB"))
+    return Overlay(render_histogram(rgb), clipping_mask(rgb))
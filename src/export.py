@@ -0,0 +1,123 @@
+import os
+import re
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from PIL import Image, ImageDraw, ImageFont
+
+# --- ROBUST IMPORT FOR LOGIC / THUMBNAILS / JOBS ---
+try:
+    from src.logic import grid_columns
+    from src.thumbnails import ThumbnailCache, make_thumbnail
+    from src.jobs import process_pool
+except ImportError:
+    from .logic import grid_columns
+    from .thumbnails import ThumbnailCache, make_thumbnail
+    from .jobs import process_pool
+
+SHEET_TILE = 480           # Long side of each image on the sheet
+SHEET_PAD = 8
+LABEL_HEIGHT = 24
+TITLE_HEIGHT = 40
+SHEET_QUALITY = 90
+SHEET_BG = (30, 30, 30)
+SHEET_FG = (220, 220, 220)
+
+
+def _font(size):
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        # Pillow < 10.1 has a single fixed-size bitmap font
+        return ImageFont.load_default()
+
+
+def _draw_label(draw, center, text, font, left=None):
+    """Draws text vertically centred on center (and horizontally unless left is given)."""
+    x0, y0, x1, y1 = draw.textbbox((0, 0), text, font=font)
+    x = left if left is not None else center[0] - (x1 - x0) // 2
+    draw.text((x, center[1] - (y1 + y0) // 2), text, fill=SHEET_FG, font=font)
+
+
+def sheet_filename(basename):
+    return re.sub(r'[\\/:*?"<>|]+', "_", basename) + ".jpg"
+
+
+def render_contact_sheet(basename, paths, tile=SHEET_TILE, cache=None):
+    """
+    Lays out one set the way the comparison grid does (same column rules),
+    each image labelled with its folder. Images come from the thumbnail cache
+    when present, so repeated exports do not decode again.
+    """
+    cache = cache or ThumbnailCache(size=tile)
+    n = len(paths)
+    cols = grid_columns(n)
+    rows = -(-n // cols)
+    cell_w = tile + SHEET_PAD
+    cell_h = tile + LABEL_HEIGHT + SHEET_PAD
+
+    sheet = Image.new("RGB", (cols * cell_w + SHEET_PAD, TITLE_HEIGHT + rows * cell_h + SHEET_PAD), SHEET_BG)
+    draw = ImageDraw.Draw(sheet)
+    _draw_label(draw, (0, TITLE_HEIGHT // 2), basename, _font(22), left=SHEET_PAD)
+    label_font = _font(14)
+
+    for i, p in enumerate(paths):
+        img = cache.get(p)
+        if img is None:
+            try:
+                img = make_thumbnail(p, tile)
+                cache.put(p, img)
+            except Exception as e:
+                print(f"[Export] Could not load {p}: {e}")
+                img = Image.new("RGB", (tile, tile), "gray")
+
+        x = SHEET_PAD + (i % cols) * cell_w
+        y = TITLE_HEIGHT + (i // cols) * cell_h
+        sheet.paste(img, (x + (tile - img.width) // 2, y + (tile - img.height) // 2))
+        label = f"{os.path.basename(os.path.dirname(p))} / {os.path.basename(p)}"
+        _draw_label(draw, (x + tile // 2, y + tile + LABEL_HEIGHT // 2), label, label_font)
+    return sheet
+
+
+def _export_one(basename, paths, out_dir, tile):
+    """Worker: renders and writes one sheet. Only the file name travels back."""
+    try:
+        out_path = os.path.join(out_dir, sheet_filename(basename))
+        render_contact_sheet(basename, paths, tile).save(out_path, "JPEG", quality=SHEET_QUALITY)
+        return basename, out_path, ""
+    except Exception as e:
+        return basename, None, str(e)
+
+
+def export_contact_sheets(sets, out_dir, tile=SHEET_TILE, workers=None, on_progress=None):
+    """
+    Writes one contact sheet per (basename, paths) pair across a process pool.
+    Submission is windowed, so only a few sets are in flight at a time and
+    sheets are written as soon as each is ready.
+    Returns: (written_paths, error_list)
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 2
+    window = 2 * workers
+    written, errors = [], []
+    with process_pool(workers) as pool:
+        pending = set()
+        todo = iter(sets)
+        done_count = 0
+        while True:
+            for basename, paths in todo:
+                pending.add(pool.submit(_export_one, basename, paths, out_dir, tile))
+                if len(pending) >= window:
+                    break
+            if not pending:
+                break
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                basename, out_path, err = future.result()
+                if out_path:
+                    written.append(out_path)
+                else:
+                    errors.append(f"{basename}: {err}")
+                done_count += 1
+                if on_progress:
+                    on_progress(done_count, len(sets))
+    return written, errors
@@ -0,0 +1,78 @@
+import threading
+
+from PIL import Image
+
+# --- ROBUST IMPORT FOR PIPELINE / TILES ---
+try:
+    from src.pipeline import make_preview
+    from src.tiles import TileCache
+except ImportError:
+    from .pipeline import make_preview
+    from .tiles import TileCache
+
+ANIMATED_EXTS = ('.gif', '.webp', '.png')      # Formats that may hold several frames (GIF, WebP, APNG)
+FRAME_CACHE_BYTES = 512 * 1024 * 1024          # Decoded frames kept, shared out over the animated tiles
+FRAMES_AHEAD = 12                              # Frames decoded ahead of the one on screen
+DEFAULT_DURATION = 100                         # ms, when a frame does not say
+MIN_DURATION = 20                              # ms, the floor browsers apply as well
+
+
+def probe(path):
+    """Number of frames in a file, from its header (1 for still images)."""
+    if not path.lower().endswith(ANIMATED_EXTS):
+        return 1
+    with Image.open(path) as img:
+        return img.n_frames if getattr(img, "is_animated", False) else 1
+
+
+class FrameStore:
+    """
+    Preview-sized frames of one animated file in a byte-budgeted LRU.
+
+    Frames are decoded in order from a single open decoder, which only moves
+    forward unless asked for an earlier frame that is no longer cached. Frames
+    that are cached (scrubbing back, looping a short clip) never touch it.
+    """
+
+    def __init__(self, path, n_frames, max_side, max_bytes=FRAME_CACHE_BYTES):
+        self.path = path
+        self.n_frames = n_frames
+        self.max_side = max_side
+        self.frames = TileCache(max_bytes)
+        self.durations = {}   # frame -> ms, filled in as frames are decoded
+        self._img = None
+        self._lock = threading.Lock()
+
+    def get(self, index):
+        return self.frames.get(index % self.n_frames)
+
+    def duration(self, index):
+        return self.durations.get(index % self.n_frames, DEFAULT_DURATION)
+
+    def missing(self, start, count=FRAMES_AHEAD):
+        """Frames from start on (wrapping around) that are not cached."""
+        count = min(count, self.n_frames)
+        wanted = [(start + k) % self.n_frames for k in range(count)]
+        return [i for i in wanted if i not in self.frames]
+
+    def decode(self, indices):
+        """Worker: decodes the given frames not cached yet. Returns the ones it decoded."""
+        decoded = []
+        with self._lock:
+            if self._img is None:
+                self._img = Image.open(self.path)
+            for i in indices:
+                if i in self.frames:
+                    continue
+                self._img.seek(i)
+                self.durations[i] = max(MIN_DURATION, self._img.info.get("duration") or DEFAULT_DURATION)
+                # Same reduction as the preview, so tile scales and overlays still fit
+                self.frames.put(i, make_preview(self._img.convert("RGBA"), self.max_side))
+                decoded.append(i)
+        return decoded
+
+    def close(self):
+        with self._lock:
+            if self._img is not None:
+                self._img.close()
+                self._img = None
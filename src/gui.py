@@ -1,21 +1,78 @@
 import tkinter as tk
-from tkinter import filedialog, messagebox
+from tkinter import filedialog, messagebox, simpledialog
 from PIL import Image, ImageTk
-import rawpy
 import os
-import sys
+import multiprocessing
 
 # --- ROBUST IMPORT FOR LOGIC ---
 try:
-    from src.logic import AppState, FileScanner, FileManager, VALID_EXTENSIONS, RAW_EXTS
+    from src.logic import (AppState, FileScanner, FileManager, KeyRules, KeyIndex, collapse_duplicates, grid_columns,
+                           page_count, page_range, tiles_per_window, visible_region, base_scale, pan_offset, TILES_PER_PAGE,
+                           ZOOM_MODES, FIXED_SCALE)
 except ImportError:
-    from .logic import AppState, FileScanner, FileManager, VALID_EXTENSIONS, RAW_EXTS
+    from .logic import (AppState, FileScanner, FileManager, KeyRules, KeyIndex, collapse_duplicates, grid_columns,
+                        page_count, page_range, tiles_per_window, visible_region, base_scale, pan_offset, TILES_PER_PAGE,
+                        ZOOM_MODES, FIXED_SCALE)
 
 # --- ROBUST IMPORT FOR ICON FACTORY ---
 try:
     from src.icon_factory import generate_icon_image
 except ImportError:
     from .icon_factory import generate_icon_image
+
+# --- ROBUST IMPORT FOR LOADING PIPELINE ---
+try:
+    from src.pipeline import LoadPipeline, PreviewCache, make_preview, PRIORITY_PREFETCH
+except ImportError:
+    from .pipeline import LoadPipeline, PreviewCache, make_preview, PRIORITY_PREFETCH
+
+# --- ROBUST IMPORT FOR SCAN INDEX ---
+try:
+    from src.index import ScanIndex, SORT_KEYS, FILTERS
+except ImportError:
+    from .index import ScanIndex, SORT_KEYS, FILTERS
+
+# --- ROBUST IMPORT FOR ANALYSIS ---
+try:
+    from src.analysis import score_files, compute_overlay
+except ImportError:
+    from .analysis import score_files, compute_overlay
+
+# --- ROBUST IMPORT FOR EXPORT ---
+try:
+    from src.export import export_contact_sheets
+except ImportError:
+    from .export import export_contact_sheets
+
+# --- ROBUST IMPORT FOR SESSION JOURNAL ---
+try:
+    from src.session import SessionJournal
+except ImportError:
+    from .session import SessionJournal
+
+# --- ROBUST IMPORT FOR THUMBNAILS ---
+try:
+    from src.thumbnails import ThumbnailService, THUMB_SIZE
+except ImportError:
+    from .thumbnails import ThumbnailService, THUMB_SIZE
+
+# --- ROBUST IMPORT FOR FULL-RESOLUTION TILES ---
+try:
+    from src.tiles import TileLoader
+except ImportError:
+    from .tiles import TileLoader
+
+# --- ROBUST IMPORT FOR ANIMATION FRAMES ---
+try:
+    from src.frames import FrameStore, probe, ANIMATED_EXTS, FRAME_CACHE_BYTES, MIN_DURATION
+except ImportError:
+    from .frames import FrameStore, probe, ANIMATED_EXTS, FRAME_CACHE_BYTES, MIN_DURATION
+
+# --- ROBUST IMPORT FOR JOB SCHEDULER ---
+try:
+    from src.jobs import JobScheduler, PRIORITY_HIGH, PRIORITY_LOW
+except ImportError:
+    from .jobs import JobScheduler, PRIORITY_HIGH, PRIORITY_LOW
 # ----------------------------------------
 
 # Colors
@@ -30,6 +87,387 @@ THEMES = {
     }
 }
 
+class OverviewBrowser:
+    """
+    Scrolling list of every matched set, one row of thumbnails per set.
+    Only rows inside (or just outside) the viewport get canvas items, and only
+    their thumbnails are requested, so thousands of sets open instantly.
+    """
+    ROW_HEIGHT = THUMB_SIZE + 34
+    GAP = 6
+    PREFETCH_ROWS = 6
+    POLL_MS = 40
+
+    def __init__(self, app, parent):
+        self.app = app
+        self.frame = tk.Frame(parent)
+        self.canvas = tk.Canvas(self.frame, highlightthickness=0)
+        self.scrollbar = tk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self.on_scroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        # Workers hand finished paths to the Tk thread through the app's job scheduler
+        self.arrived = set()
+        self.thumbs = ThumbnailService(on_ready=lambda path: app.jobs.post(self.on_thumbnail, path))
+
+        self.basenames = []
+        self.drawn_rows = {}   # row -> list of canvas item ids
+        self.photos = {}       # row -> list of PhotoImage refs
+        self.active = False
+
+        self.canvas.bind("<Configure>", lambda e: self.refresh(force=True))
+        self.canvas.bind("<Button-1>", self.on_click)
+        self.canvas.bind("<MouseWheel>", self.on_wheel)
+        self.canvas.bind("<Button-4>", self.on_wheel)
+        self.canvas.bind("<Button-5>", self.on_wheel)
+
+    def apply_theme(self, colors):
+        self.frame.configure(bg=colors["bg_container"])
+        self.canvas.configure(bg=colors["bg_container"])
+        self.refresh(force=True)
+
+    def open(self, basenames, index):
+        self.basenames = basenames
+        self.frame.pack(fill=tk.BOTH, expand=True)
+        self.canvas.configure(scrollregion=(0, 0, 1, len(basenames) * self.ROW_HEIGHT))
+        self.canvas.update_idletasks()
+        if basenames:
+            self.canvas.yview_moveto(max(0, index - 1) / len(basenames))
+        self.active = True
+        self.refresh(force=True)
+
+    def close(self):
+        self.frame.pack_forget()
+        self.active = False
+        self.thumbs.request([])
+        self.clear()
+
+    def shutdown(self):
+        self.thumbs.shutdown()
+
+    def clear(self):
+        self.canvas.delete("all")
+        self.drawn_rows = {}
+        self.photos = {}
+
+    def on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self.refresh()
+
+    def on_wheel(self, event):
+        step = 1 if (event.num == 5 or event.delta < 0) else -1
+        self.canvas.yview_scroll(step * 3, "units")
+
+    def on_click(self, event):
+        row = int(self.canvas.canvasy(event.y) // self.ROW_HEIGHT)
+        if 0 <= row < len(self.basenames):
+            self.app.open_set(row)
+
+    def visible_rows(self):
+        top = self.canvas.canvasy(0)
+        bottom = self.canvas.canvasy(self.canvas.winfo_height())
+        first = max(0, int(top // self.ROW_HEIGHT))
+        last = min(len(self.basenames) - 1, int(bottom // self.ROW_HEIGHT))
+        return first, last
+
+    def refresh(self, force=False):
+        """Draws rows entering the viewport, drops rows leaving it, re-prioritizes thumbnails."""
+        if not self.basenames:
+            self.clear()
+            return
+        if force:
+            self.clear()
+
+        first, last = self.visible_rows()
+        keep = range(max(0, first - 1), min(len(self.basenames), last + 2))
+        for row in [r for r in self.drawn_rows if r not in keep]:
+            self.drop_row(row)
+        for row in keep:
+            if row not in self.drawn_rows:
+                self.draw_row(row)
+
+        # Visible rows first, then the rows the user is most likely to scroll to
+        wanted = []
+        below = range(last + 1, min(len(self.basenames), last + 1 + self.PREFETCH_ROWS))
+        above = range(first - 1, max(-1, first - 1 - self.PREFETCH_ROWS), -1)
+        for row in list(range(first, last + 1)) + list(below) + list(above):
+            wanted.extend(self.row_paths(row))
+        self.thumbs.request(wanted)
+
+    def row_paths(self, row):
+        paths, copies = self.app.set_paths(self.basenames[row])
+        per_row = max(1, (self.canvas.winfo_width() - self.GAP) // (THUMB_SIZE + self.GAP))
+        return paths[:per_row]
+
+    def drop_row(self, row):
+        for item in self.drawn_rows.pop(row, []):
+            self.canvas.delete(item)
+        self.photos.pop(row, None)
+
+    def draw_row(self, row):
+        colors = THEMES[self.app.state.theme]
+        y = row * self.ROW_HEIGHT
+        basename = self.basenames[row]
+        paths, copies = self.app.set_paths(basename)
+        shown = self.row_paths(row)
+
+        items = []
+        if row == self.app.current_index:
+            items.append(self.canvas.create_rectangle(0, y, self.canvas.winfo_width(), y + self.ROW_HEIGHT - 2,
+                                                      fill=colors["highlight"], width=0))
+        label = f"{row + 1}.  {basename}   ({len(paths)} files)"
+        items.append(self.canvas.create_text(self.GAP, y + 4, anchor="nw", text=label,
+                                             fill=colors["fg_text"], font=("Arial", 10, "bold")))
+        photos = []
+        x = self.GAP
+        for p in shown:
+            thumb = self.thumbs.get(p)
+            if thumb is not None:
+                tk_img = ImageTk.PhotoImage(thumb)
+                photos.append(tk_img)
+                items.append(self.canvas.create_image(x + THUMB_SIZE // 2, y + 24 + THUMB_SIZE // 2,
+                                                      anchor="center", image=tk_img))
+            else:
+                items.append(self.canvas.create_rectangle(x, y + 24, x + THUMB_SIZE, y + 24 + THUMB_SIZE,
+                                                          outline=colors["highlight"]))
+            x += THUMB_SIZE + self.GAP
+        if len(paths) > len(shown):
+            items.append(self.canvas.create_text(x, y + 24 + THUMB_SIZE // 2, anchor="w",
+                                                 text=f"+{len(paths) - len(shown)}", fill=colors["fg_text"]))
+        self.drawn_rows[row] = items
+        self.photos[row] = photos
+
+    def on_thumbnail(self, path):
+        """Tk thread: collects arrivals and redraws affected rows once per POLL_MS."""
+        if not self.active:
+            return
+        if not self.arrived:
+            self.canvas.after(self.POLL_MS, self.redraw_arrived)
+        self.arrived.add(path)
+
+    def redraw_arrived(self):
+        arrived, self.arrived = self.arrived, set()
+        if not self.active:
+            return
+        for row in list(self.drawn_rows):
+            if arrived.intersection(self.row_paths(row)):
+                self.drop_row(row)
+                self.draw_row(row)
+
+class ComparisonView:
+    """
+    One grid of synchronized tiles: the main window's, or an extra viewer
+    window's. Decoding, the caches and the view state (zoom, centre) belong to
+    the app, so another view adds no decoding and pans/zooms in lockstep.
+    """
+
+    def __init__(self, app, parent):
+        self.app = app
+        self.frame = tk.Frame(parent)
+        self.canvases = []
+        self.cached_images = []
+        self.images_ref = {}      # Tile index -> PhotoImage on screen
+        self.tile_keys = []       # Canonical path of each tile
+        self.hist_photos = {}
+        self.tile_scales = []     # Base scale of each tile (preview px -> screen px)
+        self.canvas_sizes = []    # Canvas size each base scale was computed for
+        self.resize_job = None
+
+    def apply_theme(self, colors):
+        self.frame.configure(bg=colors["bg_container"])
+
+    def clear(self):
+        if self.resize_job:
+            self.frame.after_cancel(self.resize_job)
+            self.resize_job = None
+        for w in self.frame.winfo_children(): w.destroy()
+        cols_used, rows_used = self.frame.grid_size()
+        for r in range(rows_used): self.frame.rowconfigure(r, weight=0)
+        for c in range(cols_used): self.frame.columnconfigure(c, weight=0)
+        self.canvases = []
+        self.cached_images = []
+        self.images_ref = {}
+        self.tile_keys = []
+        self.hist_photos = {}
+        self.tile_scales = []
+        self.canvas_sizes = []
+
+    def show(self, paths, previews):
+        """Builds one tile per path. previews holds the cached preview of each (None until decoded)."""
+        self.clear()
+        app = self.app
+        colors = THEMES[app.state.theme]
+        self.tile_keys = [app.duplicates.get(p, p) for p in paths]
+
+        # Setup Grid
+        n = len(paths)
+        cols = grid_columns(n)
+        for i, p in enumerate(paths):
+            frame = tk.Frame(self.frame, bd=2, bg=colors["highlight"])
+            frame.grid(row=i//cols, column=i%cols, sticky="nsew", padx=2, pady=2)
+            self.frame.rowconfigure(i//cols, weight=1)
+            self.frame.columnconfigure(i%cols, weight=1)
+            
+            cv = tk.Canvas(frame, bg=colors["bg_canvas"], highlightthickness=0)
+            cv.pack(fill=tk.BOTH, expand=True)
+            self.canvases.append(cv)
+            
+            # CACHED, SCREEN-SIZED preview from the pipeline (None until decoded).
+            # This is the image we will resize during pan/zoom for speed.
+            self.cached_images.append(previews[i])
+
+            # Button and Bindings (remain the same)
+            label = "SELECT"
+            if app.group_copies.get(p, 1) > 1:
+                label = f"SELECT  (x{app.group_copies[p]} identical)"
+            if p in app.index.scores:
+                label += f"  ·  score {app.index.scores[p].score:.2f}"
+            btn = tk.Button(frame, text=label, bg="#2196F3", fg="white",
+                            command=lambda path=p: app.select_and_next(path))
+            btn.pack(side=tk.BOTTOM, fill=tk.X)
+
+            cv.bind("<Configure>", self.on_canvas_resize)
+            cv.bind("<ButtonPress-1>", app.start_pan)
+            cv.bind("<B1-Motion>", app.do_pan)
+            cv.bind("<MouseWheel>", app.do_zoom)
+            cv.bind("<Button-4>", app.do_zoom)
+            cv.bind("<Button-5>", app.do_zoom)
+            cv.bind("<Double-Button-1>", lambda e, path=p: app.select_and_next(path))
+
+        if not paths:
+            tk.Label(self.frame, text="No more tiles in this set", bg=colors["bg_container"],
+                     fg=colors["fg_text"]).place(relx=0.5, rely=0.5, anchor="center")
+
+        self.tile_scales = [None] * n
+        self.canvas_sizes = [None] * n
+        self.frame.update_idletasks()
+        self.update_scales()
+        self.redraw()
+
+    def fill(self, key, preview):
+        """Puts a decoded preview into the tiles showing key. Returns whether there were any."""
+        tiles = [i for i, k in enumerate(self.tile_keys) if k == key]
+        for i in tiles:
+            self.cached_images[i] = preview
+        self.update_scales(tiles)
+        return bool(tiles)
+
+    def scale_of(self, i):
+        return (self.tile_scales[i] or FIXED_SCALE) * self.app.zoom
+
+    def update_scales(self, tiles=None):
+        """Base scale of the given tiles (default: all) from header metadata and canvas size."""
+        for i in (range(len(self.canvases)) if tiles is None else tiles):
+            cv = self.canvases[i]
+            self.canvas_sizes[i] = (cv.winfo_width(), cv.winfo_height())
+            preview = self.cached_images[i]
+            if preview is None:
+                continue
+            full = self.app.full_size(self.tile_keys[i], preview)
+            self.tile_scales[i] = base_scale(self.app.state.zoom_mode, preview.width, preview.height,
+                                             full[0] if full else 0, *self.canvas_sizes[i])
+
+    def on_canvas_resize(self, event):
+        """Debounced: dragging the window edge fires a stream of <Configure> events."""
+        if self.resize_job:
+            self.frame.after_cancel(self.resize_job)
+        self.resize_job = self.frame.after(self.app.RESIZE_DEBOUNCE_MS, self.apply_resize)
+
+    def apply_resize(self):
+        """Rescales only the tiles whose canvas actually changed size, then redraws."""
+        self.resize_job = None
+        changed = [i for i, cv in enumerate(self.canvases)
+                   if (cv.winfo_width(), cv.winfo_height()) != self.canvas_sizes[i]]
+        if changed:
+            self.update_scales(changed)
+            self.redraw()
+
+    def detail_region(self, i, preview, scale, pan, cw, ch):
+        """
+        Full-resolution pixels for tile i once the zoom magnifies the preview.
+        Returns (view, (x, y), size, preview_box) or None when the preview is detailed enough
+        or the tiles are not decoded yet (they are requested, the preview stands in).
+        """
+        if scale <= 1.0:
+            return None
+        app = self.app
+        key = self.tile_keys[i]
+        pw, ph = preview.size
+        full = app.full_size(key, preview)
+        if full is None and max(pw, ph) >= app.CACHED_MAX_SIDE:
+            # No header size: a preview at the cap was reduced from something larger
+            full = (pw * 2, ph * 2)
+        if full is None or max(full) <= max(pw, ph):
+            return None
+
+        fscale = scale * pw / full[0]
+        region = visible_region(full[0], full[1], fscale, pan[0], pan[1], cw, ch)
+        if not region:
+            return None
+        box, pos, size = region
+        view = app.tiles.assemble(key, box) if key in app.tiles.sizes else None
+        if view is None:
+            app.tiles.request(key, box, app.tiles.cache.max_bytes // max(len(app.visible_keys()), 1), app.page_job)
+            return None
+        resample = Image.Resampling.NEAREST if fscale >= 1.0 else Image.Resampling.BILINEAR
+        # The same area in preview pixels, for anything drawn from the preview (clipping mask)
+        preview_box = (box[0] * pw / full[0], box[1] * ph / full[1], box[2] * pw / full[0], box[3] * ph / full[1])
+        return view.resize(size, resample), pos, size, preview_box
+
+    def redraw(self, keys=None):
+        """Redraws all images (or only the tiles showing keys) using the smaller cached image."""
+        app = self.app
+        for i, cached_raw in enumerate(self.cached_images):
+            if keys is not None and self.tile_keys[i] not in keys:
+                continue
+            cv = self.canvases[i]
+            cv.delete("all")
+            self.images_ref.pop(i, None)
+            
+            # Still decoding
+            if cached_raw is None:
+                cv.create_text(cv.winfo_width() // 2, cv.winfo_height() // 2, text="Loading...",
+                               fill=THEMES[app.state.theme]["fg_text"])
+                continue 
+
+            cw = cv.winfo_width()
+            ch = cv.winfo_height()
+            overlay = app.overlay_cache.get(self.tile_keys[i]) if app.state.show_overlays else None
+
+            # Animated files: the decoded frame at the shared frame index, same size as the preview
+            animated = self.tile_keys[i] in app.frame_stores
+            source = (app.current_frame(self.tile_keys[i]) if animated else None) or cached_raw
+
+            w, h = cached_raw.size
+            scale = self.scale_of(i)
+            pan = pan_offset(app.center, w * scale, h * scale)
+            region = visible_region(w, h, scale, pan[0], pan[1], cw, ch)
+            if region:
+                box, (x, y), size = region
+                detail = None if animated else self.detail_region(i, cached_raw, scale, pan, cw, ch)
+                if detail:
+                    # Zoomed past the preview: real pixels from the full-resolution tiles
+                    view, (x, y), size, box = detail
+                else:
+                    # PERFORMANCE CRITICAL: Only the on-screen part of the cached image is resized.
+                    view = source.crop(box).resize(size, Image.Resampling.NEAREST)
+                if overlay:
+                    # Same crop + scale keeps the clipping mask locked to pan/zoom
+                    view = view.convert("RGBA")
+                    mask = overlay.mask.resize(size, Image.Resampling.NEAREST, box=box)
+                    view.alpha_composite(mask.convert("RGBA"))
+                tk_img = ImageTk.PhotoImage(view)
+                self.images_ref[i] = tk_img
+                cv.create_image(x, y, anchor="nw", image=tk_img)
+
+            if overlay:
+                key = self.tile_keys[i]
+                if key not in self.hist_photos:
+                    self.hist_photos[key] = ImageTk.PhotoImage(overlay.histogram)
+                cv.create_image(cw - 6, 6, anchor="ne", image=self.hist_photos[key])
+
+
 class SyncImageComparator:
     def __init__(self, root):
         self.root = root
@@ -66,26 +504,69 @@ class SyncImageComparator:
         self.grouped_files = {}
         self.sorted_basenames = []
         self.current_index = -1
+        self.duplicates = {}
+        self.index = ScanIndex([])
+        self.key_index = None
         self.output_dir = self.state.last_output_dir
         
         # Image Specific
-        self.cached_images = []
-        self.raw_images = []
         self.CACHED_MAX_SIDE = 2500 
-        self.INITIAL_ZOOM_SCALE = 0.55
+        self.RESIZE_DEBOUNCE_MS = 120
+
+        # Virtualized grid: all candidates of the set, only one page has tiles
+        self.group_paths = []
+        self.group_copies = {}
+        self.tile_page = 0     # Page of the main window; viewer window n shows page + n
+        self.page_job = None   # Handle of the "page" group: cancelled when the page or set changes
+        self.window_tiles = TILES_PER_PAGE   # Page size: the set split over the open windows
+
+        # Histogram / clipping overlays: computed once per image off the Tk thread
+        self.overlay_cache = PreviewCache()
+        self.overlay_pending = set()
+
+        # All background work reports back to the Tk thread through this scheduler
+        self.jobs = JobScheduler(self.root)
+        # Copies get their own single lane: they run in order and are waited for on exit
+        self.copier = JobScheduler(self.root, workers=1)
+        self.closing = False
+        self.redraw_pending = False
+
+        # Full-resolution tiles for zoom past the preview; filled on worker threads
+        self.tiles = TileLoader(on_ready=lambda key: self.jobs.post(self.on_tiles, key))
         
         # View Data
-        self.raw_images = []
-        self.images_ref = []
-        self.canvases = []
-        self.scale = 1.0
-        self.pan_x = 0
-        self.pan_y = 0
+        self.views = []           # Main grid first, then one per extra viewer window
         self.drag_start = None
 
+        # Shared view, normalized so tiles of any size stay in sync across every
+        # window: zoom relative to each tile's base scale, and the image point
+        # (0..1, 0..1) at the canvas centre
+        self.zoom = 1.0
+        self.center = (0.5, 0.5)
+
+        # Animated files of the set: frames decoded ahead per file, one shared frame index
+        self.frame_stores = {}    # Canonical path -> FrameStore
+        self.frames_probed = set()
+        self.frames_pending = set()
+        self.frame_index = 0
+        self.playing = False
+        self.play_job = None
+
+        # Reads and decodes run on worker threads; decoders also build the preview.
+        # RAW files are demosaiced straight to preview size (full resolution comes from the tile loader).
+        self.pipeline = LoadPipeline(postprocess=self.build_preview, raw_preview_side=self.CACHED_MAX_SIDE)
+        # Keyed by canonical path: identical files share one preview.
+        # Bounded, so memory does not grow with the number of matched folders.
+        self.preview_cache = PreviewCache()
+
+        # Session journal: position and picks survive crashes and restarts
+        self.journal = SessionJournal()
+        self.picked = {}   # basename -> source path copied to output
+
         self.set_window_icon()
         self.setup_ui()
         self.apply_theme()
+        self.root.after(200, self.offer_resume)
 
     def on_close(self):
         """Save window geometry before exiting."""
@@ -109,6 +590,15 @@ class SyncImageComparator:
             self.state.window_geometry = self.root.geometry()
             
         self.state.save_settings()
+        self.closing = True
+        # Cancel page/set work first, then stop the pipeline without draining its queue
+        self.jobs.shutdown()
+        # A copy cut off by exit would leave a truncated file and an unjournaled pick
+        self.copier.finish()
+        self.pipeline.shutdown()
+        self.overview.shutdown()
+        self.tiles.shutdown()
+        self.journal.close()
         self.root.destroy()
 
     def set_window_icon(self):
@@ -168,7 +658,50 @@ class SyncImageComparator:
         
         # [Scan] -> MOVED HERE (To the right of Output)
         tk.Button(self.frame_left, text="Scan", command=self.scan_files).pack(side=tk.LEFT, padx=2)
+
+        # [Rules] How file names are reduced to matching keys
+        tk.Button(self.frame_left, text="Rules", command=self.edit_rules).pack(side=tk.LEFT, padx=2)
+
+        # [Duplicates] Collapse byte-identical files into one tile
+        self.btn_dupes = tk.Button(self.frame_left, command=self.toggle_duplicates)
+        self.btn_dupes.pack(side=tk.LEFT, padx=2)
+        self.update_duplicates_button()
+
+        # [Analyze / Rank / Auto-Pick] Sharpness & exposure scoring for culling
+        tk.Button(self.frame_left, text="Analyze", command=self.analyze_files).pack(side=tk.LEFT, padx=2)
+        self.btn_rank = tk.Button(self.frame_left, command=self.toggle_rank)
+        self.btn_rank.pack(side=tk.LEFT, padx=2)
+        self.update_rank_button()
+        tk.Button(self.frame_left, text="Auto-Pick", command=self.auto_pick).pack(side=tk.LEFT, padx=2)
+
+        # [Export] Contact sheet per listed set
+        tk.Button(self.frame_left, text="Export", command=self.export_sheets).pack(side=tk.LEFT, padx=2)
+
+        # [Histogram] Per-tile histogram + clipping overlay
+        self.btn_overlay = tk.Button(self.frame_left, command=self.toggle_overlays)
+        self.btn_overlay.pack(side=tk.LEFT, padx=2)
+        self.update_overlay_button()
         
+        # [Overview] All matched sets as rows of thumbnails
+        self.btn_overview = tk.Button(self.frame_left, text="Overview", command=self.toggle_overview)
+        self.btn_overview.pack(side=tk.LEFT, padx=2)
+
+        # [Zoom mode] What zoom 1.0 means for each tile
+        self.var_zoom = tk.StringVar(value=self.state.zoom_mode)
+        tk.OptionMenu(self.frame_left, self.var_zoom, *ZOOM_MODES,
+                      command=self.set_zoom_mode).pack(side=tk.LEFT, padx=2)
+
+        # [Window] Extra synchronized viewer, e.g. for a second monitor
+        tk.Button(self.frame_left, text="+ Window", command=self.open_viewer).pack(side=tk.LEFT, padx=2)
+
+        # [Sort / Filter] Driven by the header metadata index, no decoding
+        self.var_sort = tk.StringVar(value=self.state.sort_key)
+        self.var_filter = tk.StringVar(value=self.state.filter_key)
+        tk.OptionMenu(self.frame_left, self.var_sort, *SORT_KEYS,
+                      command=lambda v: self.rearrange()).pack(side=tk.LEFT, padx=2)
+        tk.OptionMenu(self.frame_left, self.var_filter, *FILTERS,
+                      command=lambda v: self.rearrange()).pack(side=tk.LEFT, padx=2)
+
         # [Theme]
         tk.Button(self.frame_left, text="🌗", command=self.toggle_theme, width=3).pack(side=tk.LEFT, padx=10)
 
@@ -176,8 +709,13 @@ class SyncImageComparator:
         self.frame_right = tk.Frame(self.control_frame)
         self.frame_right.pack(side=tk.RIGHT, fill=tk.Y)
         
+        # [Tile Pages] Only shown when a set has more candidates than fit on screen
+        self.btn_tiles_prev = tk.Button(self.frame_right, text="◀", command=self.prev_page, width=2)
+        self.lbl_tiles = tk.Label(self.frame_right, text="", width=14)
+        self.btn_tiles_next = tk.Button(self.frame_right, text="▶", command=self.next_page, width=2)
+
         # [Counter] -> MOVED HERE (To the left of Prev/Next)
-        self.lbl_status = tk.Label(self.frame_right, text="0 / 0", width=12)
+        self.lbl_status = tk.Label(self.frame_right, text="0 / 0", width=14)
         self.lbl_status.pack(side=tk.LEFT, padx=5)
 
         # [Prev]
@@ -192,12 +730,38 @@ class SyncImageComparator:
         self.lbl_current_file = tk.Label(self.control_frame, text="MultiCompare", font=("Arial", 14, "bold"))
         self.lbl_current_file.place(relx=0.5, rely=0.5, anchor="center")
 
+        # --- Playback Bar (only shown for sets with animated files) ---
+        self.play_bar = tk.Frame(self.root, pady=4, padx=5)
+        self.btn_play = tk.Button(self.play_bar, text="▶ Play", width=8, command=self.toggle_playback)
+        self.btn_play.pack(side=tk.LEFT, padx=2)
+        self.var_frame = tk.IntVar(value=0)
+        self.scale_frame = tk.Scale(self.play_bar, orient=tk.HORIZONTAL, showvalue=False, from_=0, to=0,
+                                    variable=self.var_frame, command=self.on_scrub)
+        self.scale_frame.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        self.lbl_frame = tk.Label(self.play_bar, text="", width=16)
+        self.lbl_frame.pack(side=tk.LEFT)
+
         # --- Main Grid ---
-        self.grid_frame = tk.Frame(self.root)
+        self.main_view = ComparisonView(self, self.root)
+        self.grid_frame = self.main_view.frame
         self.grid_frame.pack(fill=tk.BOTH, expand=True)
+        self.views = [self.main_view]
+
+        # --- Overview (hidden until requested) ---
+        self.overview = OverviewBrowser(self, self.root)
+        self.overview_open = False
+
+        self.bind_keys(self.root)
 
-        self.root.bind("<Right>", lambda e: self.next_group())
-        self.root.bind("<Left>", lambda e: self.prev_group())
+    def bind_keys(self, window):
+        """Navigation keys, shared by the main window and every viewer window."""
+        window.bind("<Right>", lambda e: self.next_group())
+        window.bind("<Left>", lambda e: self.prev_group())
+        window.bind("<Next>", lambda e: self.next_page())   # Page Down
+        window.bind("<Prior>", lambda e: self.prev_page())  # Page Up
+        window.bind("<Escape>", lambda e: self.close_overview())
+        window.bind("<Control-f>", lambda e: self.find_set())
+        window.bind("<space>", lambda e: self.toggle_playback())
 
     def toggle_theme(self):
         self.state.toggle_theme()
@@ -210,10 +774,20 @@ class SyncImageComparator:
         self.control_frame.configure(bg=colors["bg_main"])
         self.frame_left.configure(bg=colors["bg_main"])
         self.frame_right.configure(bg=colors["bg_main"])
-        self.grid_frame.configure(bg=colors["bg_container"])
+        for view in self.views:
+            view.apply_theme(colors)
+            if view is not self.main_view:
+                view.frame.master.configure(bg=colors["bg_container"])
         
         self.lbl_status.configure(bg=colors["bg_main"], fg=colors["fg_text"])
+        self.lbl_tiles.configure(bg=colors["bg_main"], fg=colors["fg_text"])
         self.lbl_current_file.configure(bg=colors["bg_main"], fg=colors["fg_text"])
+        self.play_bar.configure(bg=colors["bg_main"])
+        self.lbl_frame.configure(bg=colors["bg_main"], fg=colors["fg_text"])
+        self.scale_frame.configure(bg=colors["bg_main"], fg=colors["fg_text"], troughcolor=colors["bg_canvas"],
+                                   highlightthickness=0)
+        self.update_widget_colors(self.play_bar, colors)
+        self.overview.apply_theme(colors)
         
         self.update_widget_colors(self.control_frame, colors)
 
@@ -223,9 +797,307 @@ class SyncImageComparator:
             if isinstance(widget, tk.Frame):
                 widget.configure(bg=colors["bg_main"])
                 self.update_widget_colors(widget, colors)
-            elif isinstance(widget, tk.Button):
+            elif isinstance(widget, (tk.Button, tk.Menubutton)):
                 widget.configure(bg=colors["btn_bg"], fg=colors["btn_fg"], activebackground=colors["highlight"])
 
+    def toggle_duplicates(self):
+        self.state.collapse_duplicates = not self.state.collapse_duplicates
+        self.state.save_settings()
+        self.update_duplicates_button()
+        if self.state.collapse_duplicates and self.grouped_files and not self.duplicates:
+            # Hashing reads whole files: run it as a job, a new scan cancels it
+            grouped = self.grouped_files
+            self.root.config(cursor="watch")
+            self.lbl_current_file.config(text="Checking duplicates...")
+            self.jobs.submit(FileScanner.find_duplicates, grouped,
+                             on_done=lambda duplicates: self.duplicates_found(grouped, duplicates),
+                             on_error=self.duplicates_failed, priority=PRIORITY_HIGH, group="scan")
+        elif self.sorted_basenames:
+            self.load_group()
+
+    def duplicates_found(self, grouped, duplicates):
+        self.root.config(cursor="")
+        if grouped is not self.grouped_files:
+            return
+        self.duplicates = duplicates
+        self.journal.set("duplicates", self.duplicates)
+        if self.sorted_basenames:
+            self.load_group()
+
+    def duplicates_failed(self, error):
+        self.root.config(cursor="")
+        messagebox.showerror("Duplicates", str(error))
+        if self.sorted_basenames:
+            self.load_group()
+
+    def update_duplicates_button(self):
+        text = "Dupes: Collapse" if self.state.collapse_duplicates else "Dupes: Show"
+        self.btn_dupes.config(text=text)
+
+    def toggle_overview(self):
+        if self.overview_open:
+            self.close_overview()
+        elif self.sorted_basenames:
+            self.overview_open = True
+            self.grid_frame.pack_forget()
+            self.btn_overview.config(text="Compare")
+            self.lbl_current_file.config(text=f"Overview: {len(self.sorted_basenames)} sets")
+            self.overview.open(self.sorted_basenames, max(self.current_index, 0))
+
+    def close_overview(self):
+        if not self.overview_open:
+            return
+        self.overview_open = False
+        self.overview.close()
+        self.btn_overview.config(text="Overview")
+        self.grid_frame.pack(fill=tk.BOTH, expand=True)
+        if self.sorted_basenames:
+            self.lbl_current_file.config(text=self.sorted_basenames[self.current_index])
+
+    def open_set(self, index):
+        """Jumps to a set picked in the overview."""
+        self.current_index = index
+        self.close_overview()
+        self.load_group()
+
+    def toggle_rank(self):
+        self.state.rank_by_score = not self.state.rank_by_score
+        self.state.save_settings()
+        self.update_rank_button()
+        if self.sorted_basenames and not self.overview_open:
+            self.load_group()
+
+    def update_rank_button(self):
+        self.btn_rank.config(text="Order: Score" if self.state.rank_by_score else "Order: Folder")
+
+    def toggle_overlays(self):
+        self.state.show_overlays = not self.state.show_overlays
+        self.state.save_settings()
+        self.update_overlay_button()
+        if self.state.show_overlays:
+            self.request_overlays()
+        self.redraw_all()
+
+    def update_overlay_button(self):
+        self.btn_overlay.config(text="Hist: On" if self.state.show_overlays else "Hist: Off")
+
+    def request_overlays(self):
+        """Queues overlay computation for visible tiles that have none cached yet."""
+        tiles = [t for view in self.views for t in zip(view.tile_keys, view.cached_images)]
+        for key, preview in tiles:
+            if preview is None or key in self.overlay_cache or key in self.overlay_pending:
+                continue
+            self.overlay_pending.add(key)
+            self.jobs.submit(compute_overlay, preview, priority=PRIORITY_LOW,
+                             on_done=lambda overlay, k=key: self.on_overlay(k, overlay),
+                             on_error=lambda e, k=key: self.on_overlay(k, None, e))
+
+    def on_overlay(self, key, overlay, error=None):
+        """Tk side of the overlay jobs: stores the overlay and redraws if it is on screen."""
+        self.overlay_pending.discard(key)
+        if overlay is None:
+            print(f"[Overlay] Error for {key}: {error}")
+            return
+        self.overlay_cache.put(key, overlay)
+        if key in self.visible_keys() and self.state.show_overlays:
+            self.schedule_redraw()
+
+    def visible_keys(self):
+        """Canonical paths of the tiles on screen, across all windows."""
+        return [k for view in self.views for k in view.tile_keys]
+
+    def full_size(self, key, preview):
+        """
+        Full-resolution size of a file in the preview's orientation, from its
+        decode if there was one, else from the header index. Never decodes.
+        """
+        if key in self.tiles.sizes:
+            return self.tiles.sizes[key]
+        info = self.index.get(key)
+        long_side = max(info.width, info.height) if info else 0
+        if not long_side:
+            return None
+        pw, ph = preview.size
+        ratio = long_side / max(pw, ph)
+        return int(pw * ratio), int(ph * ratio)
+
+    def on_tiles(self, key):
+        """Tk side of the tile loader: redraws once new detail for a visible tile is in."""
+        if key in self.visible_keys():
+            # The decode knows the exact size; 1:1 scales may shift slightly
+            for view in self.views:
+                view.update_scales([i for i, k in enumerate(view.tile_keys) if k == key])
+            self.schedule_redraw()
+
+    def schedule_redraw(self):
+        """Coalesces redraws requested by several results arriving in the same drain."""
+        if not self.redraw_pending:
+            self.redraw_pending = True
+            self.root.after_idle(self.redraw_pending_views)
+
+    def redraw_pending_views(self):
+        self.redraw_pending = False
+        self.redraw_all()
+
+    def report(self, text):
+        """Shows progress in the title label. Safe to call from worker threads."""
+        self.jobs.post(lambda: self.lbl_current_file.config(text=text))
+
+    def run_in_background(self, work, on_done, busy_text=None):
+        """Runs work() as a job; on_done(result) runs on the Tk thread, errors are shown."""
+        if busy_text:
+            self.lbl_current_file.config(text=busy_text)
+        self.jobs.submit(work, on_done=on_done, on_error=lambda e: messagebox.showerror("Error", str(e)))
+
+    def analyze_files(self):
+        """Scores every matched file not scored yet (sharpness, clipping, noise)."""
+        todo = self.index.unscored([p for paths in self.grouped_files.values() for p in paths])
+        if not todo:
+            if self.grouped_files:
+                messagebox.showinfo("Analyze", "All matched files are already analysed.")
+            return
+
+        def progress(done, total):
+            self.report(f"Analysing {done} / {total}...")
+
+        index = self.index
+
+        def finished(scores):
+            index.scores.update(scores)
+            index.save()
+            if index is not self.index:
+                return  # Rescanned meanwhile
+            if self.sorted_basenames:
+                self.load_group()
+            else:
+                self.lbl_current_file.config(text="Analysis Done")
+
+        self.run_in_background(lambda: score_files(todo, on_progress=progress), finished,
+                               busy_text=f"Analysing 0 / {len(todo)}...")
+
+    def auto_pick(self):
+        """Copies the highest-scoring file of every listed set to the output folder."""
+        if not self.output_dir:
+            messagebox.showwarning("Warning", "Set Output Folder first.")
+            return
+        picks = [(b, self.index.best(self.grouped_files[b])) for b in self.sorted_basenames]
+        picks = [(b, p) for b, p in picks if p]
+        if not picks:
+            messagebox.showinfo("Auto-Pick", "Nothing to pick. Run Analyze first.")
+            return
+        skipped = len(self.sorted_basenames) - len(picks)
+        note = f"\n{skipped} set(s) without scores will be skipped." if skipped else ""
+        if not messagebox.askyesno("Auto-Pick", f"Copy the best image of {len(picks)} set(s) to the output folder?{note}"):
+            return
+
+        def work():
+            failed = []
+            for i, (b, p) in enumerate(picks, 1):
+                if self.closing:
+                    break   # The copy in progress was finished; the rest can be picked next time
+                self.report(f"Copying {i} / {len(picks)}...")
+                try:
+                    destination = FileManager.copy_file(p, self.output_dir)
+                except Exception as e:
+                    failed.append(f"{os.path.basename(p)}: {e}")
+                    continue
+                # self.picked belongs to the Tk thread
+                self.copier.post(self.record_pick, b, p, destination)
+            return failed
+
+        def finished(failed):
+            if self.closing:
+                return
+            if self.sorted_basenames:
+                self.lbl_current_file.config(text=self.sorted_basenames[self.current_index])
+                self.update_status()
+            if failed:
+                messagebox.showwarning("Auto-Pick", f"{len(failed)} file(s) failed:\n\n" + "\n".join(failed[:20]))
+            else:
+                messagebox.showinfo("Auto-Pick", f"Copied {len(picks)} file(s).")
+
+        self.lbl_current_file.config(text="Copying...")
+        self.copier.submit(work, on_done=finished, on_error=lambda e: messagebox.showerror("Error", str(e)))
+
+    def export_sheets(self):
+        """Renders a labelled contact sheet for every listed (sorted + filtered) set."""
+        if not self.sorted_basenames:
+            messagebox.showinfo("Export", "Nothing to export. Scan first.")
+            return
+        out_dir = filedialog.askdirectory(title="Export contact sheets to")
+        if not out_dir:
+            return
+        sets = [(b, self.set_paths(b)[0]) for b in self.sorted_basenames]
+
+        def progress(done, total):
+            self.report(f"Exporting {done} / {total}...")
+
+        def finished(result):
+            written, errors = result
+            if self.sorted_basenames:
+                self.lbl_current_file.config(text=self.sorted_basenames[self.current_index])
+            if errors:
+                messagebox.showwarning("Export", f"Wrote {len(written)} sheet(s), {len(errors)} failed:\n\n" + "\n".join(errors[:20]))
+            else:
+                messagebox.showinfo("Export", f"Wrote {len(written)} contact sheet(s).")
+
+        self.run_in_background(lambda: export_contact_sheets(sets, out_dir, on_progress=progress), finished,
+                               busy_text=f"Exporting 0 / {len(sets)}...")
+
+    def edit_rules(self):
+        """Small editor for the matching rules (see KeyRules for the syntax)."""
+        colors = THEMES[self.state.theme]
+        win = tk.Toplevel(self.root, bg=colors["bg_main"], padx=10, pady=10)
+        win.title("Matching Rules")
+        win.transient(self.root)
+
+        help_text = ("One rule per line, applied in order to the lowercase name without extension:\n"
+                     "  counters            smile_00001_  ->  smile\n"
+                     "  strip:_edit          img_edit  ->  img\n"
+                     "  regex:^(.*?)_v\\d+    shot_v2  ->  shot   (first group is the key)")
+        tk.Label(win, text=help_text, justify=tk.LEFT, font=("Courier", 10),
+                 bg=colors["bg_main"], fg=colors["fg_text"]).pack(anchor="w")
+        text = tk.Text(win, width=60, height=10, bg=colors["bg_canvas"], fg=colors["fg_text"],
+                       insertbackground=colors["fg_text"])
+        text.pack(fill=tk.BOTH, expand=True, pady=8)
+        text.insert("1.0", "\n".join(self.state.key_rules))
+
+        def save():
+            lines = [l for l in text.get("1.0", tk.END).splitlines() if l.strip()]
+            try:
+                KeyRules(lines)
+            except ValueError as e:
+                messagebox.showerror("Matching Rules", str(e), parent=win)
+                return
+            self.state.key_rules = lines
+            self.state.save_settings()
+            win.destroy()
+            if self.selected_folders and messagebox.askyesno("Matching Rules", "Rescan with the new rules?"):
+                self.scan_files()
+
+        buttons = tk.Frame(win, bg=colors["bg_main"])
+        buttons.pack(fill=tk.X)
+        tk.Button(buttons, text="Save", command=save).pack(side=tk.RIGHT, padx=2)
+        tk.Button(buttons, text="Cancel", command=win.destroy).pack(side=tk.RIGHT, padx=2)
+        self.update_widget_colors(buttons, colors)
+
+    def find_set(self):
+        """Jumps to a set by name: prefix match first, then the closest name."""
+        if not self.sorted_basenames:
+            return
+        query = simpledialog.askstring("Find Set", "Name or beginning of a name:", parent=self.root)
+        if not query:
+            return
+        if self.key_index is None:
+            self.key_index = KeyIndex(self.sorted_basenames)
+        matches = self.key_index.find(query)
+        if not matches:
+            messagebox.showinfo("Find Set", f"No set matches '{query}'.")
+            return
+        self.close_overview()
+        self.current_index = self.sorted_basenames.index(matches[0])
+        self.load_group()
+
     def add_folder(self):
         path = filedialog.askdirectory()
         if path and path not in self.selected_folders:
@@ -242,14 +1114,53 @@ class SyncImageComparator:
             self.btn_output.config(text=f"Out: {name}")
 
     def scan_files(self):
+        """Scans on a worker; the UI stays live and the result replaces the current sets."""
+        self.close_overview()
+        try:
+            rules = KeyRules(self.state.key_rules)
+        except ValueError as e:
+            messagebox.showwarning("Matching Rules", f"Rules ignored: {e}")
+            rules = None
+
+        folders = list(self.selected_folders)
+        collapse = self.state.collapse_duplicates
+        sort_key, filter_key = self.state.sort_key, self.state.filter_key
+
+        def work():
+            grouped, _, count, errors = FileScanner.scan(folders, rules)
+            duplicates = {}
+            if collapse:
+                self.report("Checking duplicates...")
+                duplicates = FileScanner.find_duplicates(grouped)
+
+            # Header-only metadata; unchanged files are taken from the saved index
+            self.report("Reading metadata...")
+            index = ScanIndex.load(folders)
+            index.refresh([p for paths in grouped.values() for p in paths])
+            index.save()
+            return grouped, index.arrange(grouped, sort_key, filter_key), errors, duplicates, index
+
+        def failed(e):
+            self.root.config(cursor="")
+            messagebox.showerror("Scan", str(e))
+
+        # A newer scan supersedes one still running
+        self.jobs.cancel("scan")
         self.root.config(cursor="watch")
         self.lbl_current_file.config(text="Scanning...")
-        self.root.update()
-        
-        self.grouped_files, self.sorted_basenames, count, errors = FileScanner.scan(self.selected_folders)
-        
+        self.jobs.submit(work, on_done=lambda result: self.scan_finished(folders, *result), on_error=failed,
+                         priority=PRIORITY_HIGH, group="scan")
+
+    def scan_finished(self, folders, grouped, ordered, errors, duplicates, index):
         self.root.config(cursor="")
-        
+        self.grouped_files, self.sorted_basenames = grouped, ordered
+        self.preview_cache.clear()
+        self.duplicates = duplicates
+        self.index = index
+        self.key_index = None
+        self.journal.start(folders, self.grouped_files, self.sorted_basenames, self.duplicates)
+        self.picked = {}
+
         if errors:
             err_msg = "\n".join(errors)
             if len(err_msg) > 500: err_msg = err_msg[:500] + "\n..."
@@ -262,150 +1173,395 @@ class SyncImageComparator:
             self.btn_next.config(state=tk.NORMAL)
             self.btn_prev.config(state=tk.NORMAL)
             self.load_group()
+        elif self.grouped_files:
+            self.show_empty("No Sets Match Filter")
         else:
-            self.lbl_current_file.config(text="No Matches Found")
-            self.lbl_status.config(text="0 / 0")
+            self.show_empty("No Matches Found")
             if not errors:
                 messagebox.showinfo("Result", "No filenames matched across the selected folders.")
 
-    def load_image_file(self, path):
-        """Loads the FULL image (no resizing here)."""
-        try:
-            if path.lower().endswith(RAW_EXTS):
-                with rawpy.imread(path) as raw:
-                    rgb = raw.postprocess(use_camera_wb=True)
-                    return Image.fromarray(rgb)
+    def show_empty(self, text):
+        for view in self.views:
+            view.clear()
+        self.current_index = -1
+        self.lbl_current_file.config(text=text)
+        self.lbl_status.config(text="0 / 0")
+        self.btn_next.config(state=tk.DISABLED)
+        self.btn_prev.config(state=tk.DISABLED)
+
+    def rearrange(self):
+        """Re-sorts and filters the sets from the metadata index, staying on the current set."""
+        self.state.sort_key = self.var_sort.get()
+        self.state.filter_key = self.var_filter.get()
+        self.state.save_settings()
+        if not self.grouped_files:
+            return
+
+        current = None
+        if 0 <= self.current_index < len(self.sorted_basenames):
+            current = self.sorted_basenames[self.current_index]
+        self.sorted_basenames = self.index.arrange(self.grouped_files, self.state.sort_key, self.state.filter_key)
+        self.journal.set("sorted_basenames", self.sorted_basenames)
+        self.key_index = None
+        if not self.sorted_basenames:
+            self.close_overview()
+            self.show_empty("No Sets Match Filter")
+            return
+
+        self.current_index = self.sorted_basenames.index(current) if current in self.sorted_basenames else 0
+        self.btn_next.config(state=tk.NORMAL)
+        self.btn_prev.config(state=tk.NORMAL)
+        if self.overview_open:
+            self.overview.open(self.sorted_basenames, self.current_index)
+        else:
+            self.load_group()
+
+    def build_preview(self, full_img):
+        """Runs on a decoder thread: reduces the full image to its screen-sized preview."""
+        return make_preview(full_img, self.CACHED_MAX_SIDE)
+
+    def load_previews(self, paths, job):
+        """
+        Returns cached previews for paths (None where not decoded yet). Missing
+        files are queued, each distinct file once, and fill in via on_preview.
+        """
+        keys = [self.duplicates.get(p, p) for p in paths]
+        found = {}
+        for k in dict.fromkeys(keys):
+            preview = self.preview_cache.get(k)
+            if preview is None:
+                self.pipeline.submit(k, lambda key, preview: self.preview_decoded(key, preview, job), job=job)
             else:
-                return Image.open(path)
+                found[k] = preview
+        return [found.get(k) for k in keys]
+
+    def prefetch_previews(self, paths, job):
+        """Decodes previews in the background, behind any visible-page work."""
+        for k in dict.fromkeys(self.duplicates.get(p, p) for p in paths):
+            if k not in self.preview_cache:
+                self.pipeline.submit(k, lambda key, preview: self.preview_decoded(key, preview, job),
+                                     priority=PRIORITY_PREFETCH, job=job)
+
+    def preview_decoded(self, key, preview, job):
+        """Decoder thread: caches the preview and hands it to the Tk thread."""
+        if preview:
+            self.preview_cache.put(key, preview)
+        self.jobs.post(self.on_preview, key, preview, job=job)
+
+    def on_preview(self, key, preview):
+        """Fills the visible tiles showing key, in every window (a gray placeholder if it failed)."""
+        preview = preview or Image.new('RGB', (100,100), 'gray')
+        if not [view for view in self.views if view.fill(key, preview)]:
+            return
+        if self.state.show_overlays:
+            self.request_overlays()
+        self.schedule_redraw()
+
+    def update_status(self):
+        """Set counter, with a tick when something was already picked from this set."""
+        basename = self.sorted_basenames[self.current_index]
+        mark = "  ✓" if basename in self.picked else ""
+        self.lbl_status.config(text=f"{self.current_index + 1} / {len(self.sorted_basenames)}{mark}")
+
+    def offer_resume(self):
+        """Offers to continue the journaled session without rescanning."""
+        try:
+            session = self.journal.load()
         except Exception as e:
-            print(f"Error loading {path}: {e}")
-            return None
+            print(f"[Session] Could not read journal: {e}")
+            return
+        if not session:
+            return
+        total = len(session["sorted_basenames"])
+        index = min(max(session.get("current_index", 0), 0), total - 1)
+        msg = (f"Resume the previous session?\n\n{len(session['folders'])} folder(s), "
+               f"set {index + 1} of {total}, {len(session['selections'])} picked.")
+        if not messagebox.askyesno("Resume Session", msg):
+            return
+
+        self.selected_folders = session["folders"]
+        self.grouped_files = session["grouped_files"]
+        self.sorted_basenames = session["sorted_basenames"]
+        self.key_index = None
+        self.duplicates = session.get("duplicates", {})
+        self.picked = session["selections"]
+        self.current_index = index
+        # Metadata and scores come from the saved index; nothing is re-read
+        self.index = ScanIndex.load(self.selected_folders)
+        self.preview_cache.clear()
+        self.btn_next.config(state=tk.NORMAL)
+        self.btn_prev.config(state=tk.NORMAL)
+        self.load_group()
+
+    def set_paths(self, basename):
+        """Candidate paths of a set, with identical files collapsed if enabled."""
+        paths, copies = self.grouped_files[basename], {}
+        if self.state.collapse_duplicates:
+            paths, copies = collapse_duplicates(paths, self.duplicates)
+        if self.state.rank_by_score:
+            paths = self.index.rank(paths)
+        return paths, copies
 
     def load_group(self):
         if not self.sorted_basenames: return
 
         basename = self.sorted_basenames[self.current_index]
-        total_sets = len(self.sorted_basenames)
         
         # Title Updates
         self.lbl_current_file.config(text=basename)
-        self.lbl_status.config(text=f"{self.current_index + 1} / {total_sets}")
+        self.update_status()
         self.root.title(f"MultiCompare - {basename}")
+        self.journal.set("current_index", self.current_index)
 
-        # Clear Caches
-        for w in self.grid_frame.winfo_children(): w.destroy()
-        self.canvases = []
-        self.raw_images = []
-        self.cached_images = [] # Clear the cache!
-        self.images_ref = []
-        
-        paths = self.grouped_files[basename][:10]
+        paths, copies = self.set_paths(basename)
+        self.group_paths = paths
+        self.group_copies = copies
+        self.tile_page = 0
 
-        # Setup Grid
-        n = len(paths)
-        cols = 3 if n > 4 else (2 if n > 1 else 1)
-        if n > 6: cols = 4
-        
-        # Set Initial Scale (0.55 = 55% zoom)
-        self.scale = self.INITIAL_ZOOM_SCALE
-        self.pan_x = 0
-        self.pan_y = 0
-        
-        colors = THEMES[self.state.theme]
+        # Back to zoom 1.0 of the zoom mode, centred. The view is shared by every page.
+        self.zoom = 1.0
+        self.center = (0.5, 0.5)
+        self.reset_animation()
 
-        for i, p in enumerate(paths):
-            frame = tk.Frame(self.grid_frame, bd=2, bg=colors["highlight"])
-            frame.grid(row=i//cols, column=i%cols, sticky="nsew", padx=2, pady=2)
-            self.grid_frame.rowconfigure(i//cols, weight=1)
-            self.grid_frame.columnconfigure(i%cols, weight=1)
-            
-            cv = tk.Canvas(frame, bg=colors["bg_canvas"], highlightthickness=0)
-            cv.pack(fill=tk.BOTH, expand=True)
-            self.canvases.append(cv)
-            
-            # 1. Load Full-Resolution Image
-            full_img = self.load_image_file(p)
-
-            if full_img:
-                self.raw_images.append(full_img)
-                
-                # 2. CREATE THE CACHED, SCREEN-SIZED IMAGE
-                # This is the image we will resize during pan/zoom for speed.
-                
-                # Calculate required downsample size (e.g., max 2500px on the long side)
-                w, h = full_img.size
-                if w > self.CACHED_MAX_SIDE or h > self.CACHED_MAX_SIDE:
-                    ratio = min(self.CACHED_MAX_SIDE / w, self.CACHED_MAX_SIDE / h)
-                    nw, nh = int(w * ratio), int(h * ratio)
-                    
-                    # Use a high-quality filter once for the cache image
-                    cached_img = full_img.resize((nw, nh), Image.Resampling.LANCZOS)
-                else:
-                    cached_img = full_img.copy()
+        self.show_page()
 
-                self.cached_images.append(cached_img)
-            else:
-                self.raw_images.append(None)
-                self.cached_images.append(Image.new('RGB', (100,100), 'gray'))
+    def show_page(self):
+        """
+        Builds tiles for the current page only (viewer windows take the pages after it)
+        and prefetches the neighbouring pages. With several windows the set is split
+        evenly between them, so a small set still fills every screen.
+        """
+        total = len(self.group_paths)
+        per = self.window_tiles = tiles_per_window(total, len(self.views))
+        pages = page_count(total, per)
+        self.tile_page = min(max(self.tile_page, 0), pages - 1)
+        shown = [page_range(total, page, per) if page < pages else (total, total)
+                 for page in range(self.tile_page, self.tile_page + len(self.views))]
+        self.update_page_controls(shown[0][0], max(stop for start, stop in shown), total)
 
+        # Decodes still queued for the page (or set) we are leaving are dropped
+        self.jobs.cancel("page")
+        job = self.page_job = self.jobs.handle("page")
+        # One request for all windows: a file shown twice is still decoded once
+        previews = self.load_previews(self.group_paths[shown[0][0]:shown[-1][1]], job)
 
-            # Button and Bindings (remain the same)
-            btn = tk.Button(frame, text="SELECT", bg="#2196F3", fg="white",
-                            command=lambda path=p: self.select_and_next(path))
-            btn.pack(side=tk.BOTTOM, fill=tk.X)
+        offset = shown[0][0]
+        for view, (start, stop) in zip(self.views, shown):
+            view.show(self.group_paths[start:stop], previews[start - offset:stop - offset])
+        if self.state.show_overlays:
+            self.request_overlays()
+        self.probe_animations()
 
-            cv.bind("<ButtonPress-1>", self.start_pan)
-            cv.bind("<B1-Motion>", self.do_pan)
-            cv.bind("<MouseWheel>", self.do_zoom)
-            cv.bind("<Button-4>", self.do_zoom)
-            cv.bind("<Button-5>", self.do_zoom)
-            cv.bind("<Double-Button-1>", lambda e, path=p: self.select_and_next(path))
+        # Neighbours: flipping a page should find its previews already decoded
+        for page in (self.tile_page + len(self.views), self.tile_page - 1):
+            if 0 <= page < pages:
+                a, b = page_range(total, page, per)
+                self.prefetch_previews(self.group_paths[a:b], job)
 
-        self.root.update_idletasks()
-        self.redraw_all()
+    def update_page_controls(self, start, stop, total):
+        if start == 0 and stop >= total:
+            for w in (self.btn_tiles_prev, self.lbl_tiles, self.btn_tiles_next):
+                w.pack_forget()
+            return
+        if not self.lbl_tiles.winfo_manager():
+            self.btn_tiles_prev.pack(side=tk.LEFT, padx=2, before=self.lbl_status)
+            self.lbl_tiles.pack(side=tk.LEFT, before=self.lbl_status)
+            self.btn_tiles_next.pack(side=tk.LEFT, padx=2, before=self.lbl_status)
+        self.lbl_tiles.config(text=f"Tiles {start + 1}-{stop} of {total}")
+        self.btn_tiles_prev.config(state=tk.NORMAL if start > 0 else tk.DISABLED)
+        self.btn_tiles_next.config(state=tk.NORMAL if stop < total else tk.DISABLED)
+
+    def next_page(self):
+        """Advances by as many pages as there are windows, so every window shows new tiles."""
+        last = page_range(len(self.group_paths), self.tile_page + len(self.views) - 1, self.window_tiles)
+        if last[1] < len(self.group_paths):
+            self.tile_page += len(self.views)
+            self.show_page()
+
+    def prev_page(self):
+        if self.tile_page > 0:
+            self.tile_page = max(0, self.tile_page - len(self.views))
+            self.show_page()
+
+    def open_viewer(self):
+        """Opens another synchronized window (e.g. for a second monitor); the set's tiles are shared out again."""
+        colors = THEMES[self.state.theme]
+        win = tk.Toplevel(self.root, bg=colors["bg_container"])
+        win.title(f"MultiCompare - Viewer {len(self.views) + 1}")
+        win.geometry(f"{self.root.winfo_width()}x{self.root.winfo_height()}")
+        view = ComparisonView(self, win)
+        view.apply_theme(colors)
+        view.frame.pack(fill=tk.BOTH, expand=True)
+        self.views.append(view)
+        win.protocol("WM_DELETE_WINDOW", lambda: self.close_viewer(view))
+        self.bind_keys(win)
+        self.reflow_windows()
+
+    def close_viewer(self, view):
+        self.views.remove(view)
+        view.clear()
+        view.frame.master.destroy()
+        self.reflow_windows()
+
+    def reflow_windows(self):
+        """Re-splits the set after a window opened or closed, keeping the first tile on screen."""
+        if not self.group_paths:
+            return
+        first = self.tile_page * self.window_tiles
+        self.tile_page = first // tiles_per_window(len(self.group_paths), len(self.views))
+        self.show_page()
         
-    def redraw_all(self):
-        """Redraws all images using the smaller cached image."""
-        self.images_ref = []
-        for i, cached_raw in enumerate(self.cached_images):
-            cv = self.canvases[i]
-            cv.delete("all")
-            
-            # Check for placeholder/error image
-            if cached_raw is None:
-                continue 
+    def redraw_all(self, keys=None):
+        """Redraws every window (or only tiles showing keys) from the shared view state."""
+        for view in self.views:
+            view.redraw(keys)
 
-            w, h = cached_raw.size
-            nw, nh = int(w * self.scale), int(h * self.scale)
-            
-            if nw > 0 and nh > 0:
-                # PERFORMANCE CRITICAL: Only resizing the smaller cached image.
-                resized = cached_raw.resize((nw, nh), Image.Resampling.NEAREST) 
-                tk_img = ImageTk.PhotoImage(resized)
-                self.images_ref.append(tk_img)
-                
-                cw = cv.winfo_width()
-                ch = cv.winfo_height()
-                
-                # Center calculation
-                cx = cw // 2
-                cy = ch // 2
-                
-                x = cx - (nw // 2) + self.pan_x
-                y = cy - (nh // 2) + self.pan_y
-                
-                cv.create_image(x, y, anchor="nw", image=tk_img)
+    # --- Animation playback ---
+
+    def probe_animations(self):
+        """Checks the visible files that may be animated (header only) and sets up playback for them."""
+        for key in dict.fromkeys(self.visible_keys()):
+            if key in self.frames_probed or not key.lower().endswith(ANIMATED_EXTS):
+                continue
+            self.frames_probed.add(key)
+            self.jobs.submit(probe, key, group="set", on_done=lambda n, k=key: self.on_probe(k, n))
+
+    def on_probe(self, key, n_frames):
+        if n_frames < 2:
+            return
+        self.frame_stores[key] = FrameStore(key, n_frames, self.CACHED_MAX_SIDE)
+        # The frame budget is shared out evenly over the animated files of the set
+        for store in self.frame_stores.values():
+            store.frames.resize(FRAME_CACHE_BYTES // len(self.frame_stores))
+        self.update_play_bar()
+        self.request_frames()
+
+    def reset_animation(self):
+        """Stops playback and drops the frames of the previous set."""
+        self.jobs.cancel("set")
+        self.playing = False
+        if self.play_job:
+            self.root.after_cancel(self.play_job)
+            self.play_job = None
+        for store in self.frame_stores.values():
+            # A decode may still hold the store; let a worker wait for it
+            self.jobs.submit(store.close)
+        self.frame_stores = {}
+        self.frames_probed = set()
+        self.frames_pending = set()
+        self.frame_index = 0
+        self.update_play_bar()
+
+    def frame_count(self):
+        return max((store.n_frames for store in self.frame_stores.values()), default=1)
+
+    def current_frame(self, key):
+        """Frame of key at the shared frame index, or None if it is not decoded yet."""
+        store = self.frame_stores.get(key)
+        return store.get(self.frame_index) if store else None
+
+    def request_frames(self):
+        """Decodes frames ahead of the shared index, one job per file at a time."""
+        for key, store in self.frame_stores.items():
+            if key in self.frames_pending:
+                continue
+            missing = store.missing(self.frame_index)
+            if missing:
+                self.frames_pending.add(key)
+                self.jobs.submit(store.decode, missing, group="set",
+                                 on_done=lambda decoded, k=key: self.on_frames(k, decoded),
+                                 on_error=lambda e, k=key: self.on_frames(k, [], e))
+
+    def on_frames(self, key, decoded, error=None):
+        self.frames_pending.discard(key)
+        store = self.frame_stores.get(key)
+        if store is None:
+            return
+        if error is not None:
+            print(f"[Frames] Error decoding {key}: {error}")
+            del self.frame_stores[key]
+            self.jobs.submit(store.close)
+            self.update_play_bar()
+            self.redraw_all([key])
+            return
+        if self.frame_index % store.n_frames in decoded:
+            self.redraw_all([key])
+
+    def update_play_bar(self):
+        if not self.frame_stores:
+            self.play_bar.pack_forget()
+            self.btn_play.config(text="▶ Play")
+            return
+        if not self.play_bar.winfo_manager():
+            self.play_bar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.scale_frame.config(to=self.frame_count() - 1)
+        self.lbl_frame.config(text=f"Frame {self.frame_index + 1} / {self.frame_count()}")
+
+    def toggle_playback(self):
+        if not self.frame_stores:
+            return
+        self.playing = not self.playing
+        self.btn_play.config(text="⏸ Pause" if self.playing else "▶ Play")
+        if self.playing and not self.play_job:
+            self.play_tick()
+        elif not self.playing and self.play_job:
+            self.root.after_cancel(self.play_job)
+            self.play_job = None
+
+    def play_tick(self):
+        """The single playback clock: all tiles advance together, waiting for frames still decoding."""
+        self.play_job = None
+        if not self.playing or not self.frame_stores:
+            return
+        following = (self.frame_index + 1) % self.frame_count()
+        if all(store.get(following) is not None for store in self.frame_stores.values()):
+            self.show_frame(following)
+            # Timing follows the longest animation of the set
+            master = max(self.frame_stores.values(), key=lambda store: store.n_frames)
+            delay = master.duration(following)
+        else:
+            self.request_frames()
+            delay = MIN_DURATION
+        self.play_job = self.root.after(delay, self.play_tick)
+
+    def show_frame(self, index):
+        """Moves every animated tile to frame index. Cached frames show at once, the rest as they decode."""
+        self.frame_index = index % self.frame_count()
+        self.var_frame.set(self.frame_index)
+        self.lbl_frame.config(text=f"Frame {self.frame_index + 1} / {self.frame_count()}")
+        self.request_frames()
+        self.redraw_all(set(self.frame_stores))
+
+    def on_scrub(self, value):
+        index = int(float(value))
+        if index == self.frame_index:
+            return   # Set by playback, not by the user
+        if self.playing:
+            self.toggle_playback()
+        self.show_frame(index)
 
     def select_and_next(self, path):
+        """Moves on at once; the copy runs as a job and reports back when done."""
         if not self.output_dir:
             messagebox.showwarning("Warning", "Set Output Folder first.")
             return
 
-        success, msg = FileManager.copy_to_output(path, self.output_dir)
-        if success:
-            self.next_group()
-        else:
-            messagebox.showerror("Error", msg)
+        basename = self.sorted_basenames[self.current_index]
+
+        def failed(e):
+            messagebox.showerror("Error", f"{os.path.basename(path)}: {e}")
+
+        self.copier.submit(FileManager.copy_file, path, self.output_dir,
+                           on_done=lambda destination: self.record_pick(basename, path, destination),
+                           on_error=failed)
+        self.next_group()
+
+    def record_pick(self, basename, source, destination):
+        """Tk side of a finished copy: marks the set as picked and journals where the file went."""
+        self.picked[basename] = source
+        self.journal.record_selection(basename, source, destination)
+        if 0 <= self.current_index < len(self.sorted_basenames):
+            self.update_status()
 
     def start_pan(self, event):
         self.drag_start = (event.x, event.y)
@@ -414,16 +1570,35 @@ class SyncImageComparator:
         if not self.drag_start: return
         dx = event.x - self.drag_start[0]
         dy = event.y - self.drag_start[1]
-        self.pan_x += dx
-        self.pan_y += dy
         self.drag_start = (event.x, event.y)
+        for view in self.views:
+            if event.widget in view.canvases:
+                i = view.canvases.index(event.widget)
+                preview = view.cached_images[i]
+                break
+        else:
+            return
+        if preview is None:
+            return
+        # The dragged tile follows the mouse; the others move by the same fraction of their size
+        scale = view.scale_of(i)
+        self.center = (self.center[0] - dx / (preview.width * scale),
+                       self.center[1] - dy / (preview.height * scale))
         self.redraw_all()
         
     def do_zoom(self, event):
         if event.num == 5 or event.delta < 0:
-            self.scale *= 0.9
+            self.zoom *= 0.9
         else:
-            self.scale *= 1.1
+            self.zoom *= 1.1
+        self.redraw_all()
+
+    def set_zoom_mode(self, mode):
+        self.state.zoom_mode = mode
+        self.state.save_settings()
+        self.zoom = 1.0
+        for view in self.views:
+            view.update_scales()
         self.redraw_all()
 
     def next_group(self):
@@ -444,4 +1619,5 @@ def main():
     root.mainloop()
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
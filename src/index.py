@@ -0,0 +1,237 @@
+import os
+import json
+import time
+import hashlib
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+import rawpy
+
+# --- ROBUST IMPORT FOR LOGIC / ANALYSIS ---
+try:
+    from src.logic import RAW_EXTS, CACHE_DIR
+    from src.analysis import Scores
+except ImportError:
+    from .logic import RAW_EXTS, CACHE_DIR
+    from .analysis import Scores
+
+INDEX_VERSION = 1
+HEADER_WORKERS = 8
+
+# EXIF tags
+TAG_ORIENTATION = 0x0112
+TAG_MAKE = 0x010F
+TAG_MODEL = 0x0110
+TAG_DATETIME = 0x0132
+TAG_EXIF_IFD = 0x8769
+TAG_DATETIME_ORIGINAL = 0x9003
+TAG_ISO = 0x8827
+
+# LibRaw flip codes -> EXIF orientation
+RAW_FLIP_TO_ORIENTATION = {0: 1, 3: 3, 5: 8, 6: 6}
+
+# One compact record per file. width/height are as displayed (orientation applied).
+# taken is a UNIX timestamp, 0 when the file carries no capture time.
+ImageInfo = namedtuple("ImageInfo", "size mtime width height orientation taken camera iso")
+
+
+def _exif_time(value):
+    try:
+        return time.mktime(time.strptime(str(value).strip("\x00 "), "%Y:%m:%d %H:%M:%S"))
+    except (ValueError, OverflowError):
+        return 0
+
+
+def read_header(path):
+    """
+    Reads size, orientation, capture time and camera from the file header.
+    No pixel data is decoded.
+    """
+    st = os.stat(path)
+    width = height = iso = 0
+    orientation = 1
+    taken = 0
+    camera = ""
+
+    # 1. EXIF via PIL (JPEG/PNG/TIFF/WebP and TIFF-based RAWs such as NEF/ARW/DNG)
+    try:
+        with Image.open(path) as img:
+            width, height = img.size
+            exif = img.getexif()
+            orientation = exif.get(TAG_ORIENTATION, 1) or 1
+            camera = " ".join(str(exif.get(t, "")).strip("\x00 ") for t in (TAG_MAKE, TAG_MODEL)).strip()
+            sub = exif.get_ifd(TAG_EXIF_IFD)
+            taken = _exif_time(sub.get(TAG_DATETIME_ORIGINAL) or exif.get(TAG_DATETIME) or "")
+            iso = sub.get(TAG_ISO, 0) or 0
+    except Exception:
+        pass
+
+    # 2. RAW: LibRaw parses the header on open; unpacking happens only on demand
+    if path.lower().endswith(RAW_EXTS):
+        try:
+            with rawpy.imread(path) as raw:
+                width, height = raw.sizes.width, raw.sizes.height
+                orientation = RAW_FLIP_TO_ORIENTATION.get(raw.sizes.flip, 1)
+                other = getattr(raw, "other", None)  # rawpy >= 0.22
+                if other is not None:
+                    if not taken and other.timestamp:
+                        taken = other.timestamp.timestamp()
+                    iso = iso or int(other.iso_speed)
+        except Exception:
+            pass
+        # Raw sensor dimensions are pre-rotation
+        if orientation in (5, 6, 7, 8):
+            width, height = height, width
+    elif orientation in (5, 6, 7, 8):
+        width, height = height, width
+
+    if isinstance(iso, tuple):
+        iso = iso[0] if iso else 0
+    return ImageInfo(st.st_size, st.st_mtime_ns, width, height, int(orientation),
+                     taken, camera, int(iso))
+
+
+def _set_taken(infos):
+    times = [i.taken for i in infos if i.taken]
+    return min(times) if times else float("inf")
+
+# Sort keys for a whole set, given the ImageInfo of each of its files
+SORT_KEYS = {
+    "Name": None,
+    "Capture time": _set_taken,
+    "File size": lambda infos: -max((i.size for i in infos), default=0),
+    "Dimensions": lambda infos: -max((i.width * i.height for i in infos), default=0),
+    "Camera": lambda infos: min((i.camera.lower() for i in infos if i.camera), default="~"),
+}
+
+FILTERS = {
+    "All": None,
+    "Landscape": lambda paths, infos: any(i.width > i.height for i in infos),
+    "Portrait": lambda paths, infos: any(i.height > i.width for i in infos),
+    "Contains RAW": lambda paths, infos: any(p.lower().endswith(RAW_EXTS) for p in paths),
+    "Mixed sizes": lambda paths, infos: len({(i.width, i.height) for i in infos}) > 1,
+}
+
+
+class ScanIndex:
+    """
+    Per-file metadata (and quality scores, once analysed) for a set of scanned
+    folders, persisted next to the thumbnail cache. Records are reused as long
+    as file size and mtime match.
+    """
+
+    def __init__(self, folders):
+        self.folders = sorted(folders)
+        self.records = {}
+        self.scores = {}
+
+    @staticmethod
+    def default_path(folders, cache_dir=CACHE_DIR):
+        key = "\n".join(sorted(os.path.abspath(f) for f in folders))
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=12).hexdigest()
+        return os.path.join(cache_dir, "index", digest + ".json")
+
+    @classmethod
+    def load(cls, folders, filepath=None):
+        index = cls(folders)
+        filepath = filepath or cls.default_path(folders)
+        if os.path.exists(filepath):
+            try:
+                with open(filepath, "r") as f:
+                    data = json.load(f)
+                if data.get("version") == INDEX_VERSION:
+                    index.records = {p: ImageInfo(*v) for p, v in data["records"].items()}
+                    index.scores = {p: Scores(*v) for p, v in data.get("scores", {}).items()}
+            except Exception:
+                # A damaged index is rebuilt by the next refresh
+                pass
+        return index
+
+    def save(self, filepath=None):
+        filepath = filepath or self.default_path(self.folders)
+        try:
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+            data = {
+                "version": INDEX_VERSION,
+                "folders": self.folders,
+                "fields": ImageInfo._fields,
+                "records": {p: list(info) for p, info in self.records.items()},
+                "scores": {p: list(sc) for p, sc in self.scores.items()},
+            }
+            tmp = filepath + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp, filepath)
+            return True, ""
+        except Exception as e:
+            return False, str(e)
+
+    def refresh(self, paths):
+        """
+        Brings the index in line with paths: stale or missing records are
+        re-read from headers, records of files no longer present are dropped.
+        Returns the number of headers read.
+        """
+        stale = []
+        for p in paths:
+            info = self.records.get(p)
+            try:
+                st = os.stat(p)
+            except OSError:
+                continue
+            if info is None or info.size != st.st_size or info.mtime != st.st_mtime_ns:
+                stale.append(p)
+
+        with ThreadPoolExecutor(max_workers=HEADER_WORKERS) as pool:
+            for p, info in zip(stale, pool.map(self._safe_read, stale)):
+                if info is not None:
+                    self.records[p] = info
+        # Scores belong to the old file contents
+        for p in stale:
+            self.scores.pop(p, None)
+
+        wanted = set(paths)
+        self.records = {p: i for p, i in self.records.items() if p in wanted}
+        self.scores = {p: sc for p, sc in self.scores.items() if p in wanted}
+        return len(stale)
+
+    @staticmethod
+    def _safe_read(path):
+        try:
+            return read_header(path)
+        except OSError:
+            return None
+
+    def get(self, path):
+        return self.records.get(path)
+
+    def unscored(self, paths):
+        return [p for p in paths if p not in self.scores]
+
+    def rank(self, paths):
+        """Orders paths best score first. Unscored files keep their order, after scored ones."""
+        return sorted(paths, key=lambda p: -self.scores[p].score if p in self.scores else float("inf"))
+
+    def best(self, paths):
+        """The highest-scoring path, or None if none of them is scored."""
+        scored = [p for p in paths if p in self.scores]
+        return max(scored, key=lambda p: self.scores[p].score) if scored else None
+
+    def arrange(self, grouped_files, sort_key="Name", filter_key="All"):
+        """Returns the basenames of grouped_files, filtered and sorted by set metadata."""
+        keep = FILTERS.get(filter_key)
+        basenames = []
+        for name, paths in grouped_files.items():
+            if keep is None or keep(paths, self._infos(paths)):
+                basenames.append(name)
+
+        key = SORT_KEYS.get(sort_key)
+        basenames.sort()
+        if key is not None:
+            # Stable sort: ties stay in name order
+            basenames.sort(key=lambda name: key(self._infos(grouped_files[name])))
+        return basenames
+
+    def _infos(self, paths):
+        return [i for i in (self.records.get(p) for p in paths) if i is not None]
@@ -0,0 +1,165 @@
+import queue
+import itertools
+import threading
+import weakref
+import multiprocessing
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+PRIORITY_HIGH = 0          # The user is waiting on it (scanning, duplicate check)
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2           # Nice to have (overlays)
+_PRIORITY_STOP = 99
+
+JOB_WORKERS = 4
+DRAIN_MS = 30              # How often the Tk side picks up results
+
+
+def process_pool(workers=None):
+    """
+    Process pool for CPU-bound batch work (scoring, export) started from the GUI.
+    Children are spawned, not forked: the pool is created on a job thread, and a
+    forked child would inherit locks held by the scheduler, pipeline and Tk
+    threads at that moment and could deadlock on them.
+    """
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+class Job:
+    """
+    Handle of one unit of background work. Cancelling only sets a flag:
+    queued work is skipped, running work may check `cancelled`, and results
+    of a cancelled job are never delivered to the Tk thread.
+    """
+
+    def __init__(self, group=None):
+        self.group = group
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+
+
+class JobScheduler:
+    """
+    Worker threads plus a result queue drained on the Tk thread.
+
+    Tk widgets may only be touched from the main loop, so workers never call
+    back directly: submit() runs fn on a worker and queues on_done(result)
+    (or on_error(exception)); post() queues any callback from any thread.
+    The queue is drained every DRAIN_MS by root.after. Jobs share a group
+    so that everything belonging to, e.g., a page that was skipped can be
+    cancelled at once.
+    """
+
+    def __init__(self, root=None, workers=JOB_WORKERS, drain_ms=DRAIN_MS):
+        self.root = root
+        self.drain_ms = drain_ms
+        self._requests = queue.PriorityQueue()
+        self._order = itertools.count()
+        self._results = queue.Queue()
+        self._groups = defaultdict(weakref.WeakSet)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._threads = [threading.Thread(target=self._work_loop, daemon=True) for _ in range(workers)]
+        for t in self._threads:
+            t.start()
+        if root is not None:
+            root.after(drain_ms, self._tick)
+
+    # --- Any thread ---
+
+    def submit(self, fn, *args, on_done=None, on_error=None, priority=PRIORITY_NORMAL, group=None):
+        """Queues fn(*args) on a worker. Callbacks run on the Tk thread. Returns the Job."""
+        job = self.handle(group)
+        self._requests.put((priority, next(self._order), job, fn, args, on_done, on_error))
+        return job
+
+    def handle(self, group=None):
+        """A Job for work done elsewhere (e.g. the load pipeline) that cancel(group) should reach."""
+        job = Job(group)
+        if group is not None:
+            with self._lock:
+                self._groups[group].add(job)
+        return job
+
+    def post(self, callback, *args, job=None):
+        """Runs callback(*args) on the Tk thread, unless job has been cancelled by then."""
+        self._results.put((job, callback, args))
+
+    def cancel(self, group):
+        """Cancels every job of group that is queued, running or waiting for delivery."""
+        with self._lock:
+            jobs = list(self._groups.pop(group, ()))
+        for job in jobs:
+            job.cancel()
+
+    def shutdown(self):
+        """Cancels everything and stops the workers without waiting for running jobs."""
+        self._closed = True
+        with self._lock:
+            groups = list(self._groups)
+        for group in groups:
+            self.cancel(group)
+        for _ in self._threads:
+            self._requests.put((_PRIORITY_STOP, next(self._order), None, None, (), None, None))
+
+    def finish(self):
+        """
+        Stops the workers once everything already queued has run, waits for them
+        and delivers the results. For work that must not be cut off (copies on exit).
+        """
+        self._closed = True
+        for _ in self._threads:
+            self._requests.put((_PRIORITY_STOP, next(self._order), None, None, (), None, None))
+        for t in self._threads:
+            t.join()
+        self.drain()
+
+    # --- Tk thread ---
+
+    def drain(self):
+        """Runs every queued callback. Returns how many ran."""
+        ran = 0
+        while True:
+            try:
+                job, callback, args = self._results.get_nowait()
+            except queue.Empty:
+                return ran
+            if job is not None and job.cancelled:
+                continue
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"[Jobs] Callback {getattr(callback, '__name__', callback)} failed: {e}")
+            ran += 1
+
+    def _tick(self):
+        if self._closed:
+            return
+        self.drain()
+        self.root.after(self.drain_ms, self._tick)
+
+    # --- Workers ---
+
+    def _work_loop(self):
+        while True:
+            priority, order, job, fn, args, on_done, on_error = self._requests.get()
+            if job is None:
+                return
+            if job.cancelled:
+                continue
+            try:
+                result = fn(*args)
+            except Exception as e:
+                if on_error:
+                    self.post(on_error, e, job=job)
+                else:
+                    print(f"[Jobs] {getattr(fn, '__name__', fn)} failed: {e}")
+                continue
+            if on_done:
+                self.post(on_done, result, job=job)
@@ -2,19 +2,45 @@ import os
 import json
 import shutil
 import time
+import hashlib
+import math
+import re
+import bisect
+import difflib
+import itertools
 
 # Constants
 CONFIG_FILE = "img_compare_settings.json"
+CACHE_DIR = "multicompare_cache"
 STANDARD_EXTS = ('.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.tif', '.gif', '.webp')
 RAW_EXTS = ('.arw', '.cr2', '.cr3', '.nef', '.dng', '.orf', '.raf', '.rw2', '.pef', '.srw')
 VALID_EXTENSIONS = STANDARD_EXTS + RAW_EXTS
 
+# Content fingerprinting: hash a few blocks first, the whole file only on collision
+SAMPLE_BLOCK_SIZE = 64 * 1024
+SAMPLE_BLOCKS = 3
+HASH_CHUNK_SIZE = 1024 * 1024
+
+COPY_CHUNK = 4 * 1024 * 1024      # Picks are streamed to the output folder in blocks of this size
+
+# Comparison grid
+TILES_PER_PAGE = 10
+ZOOM_MODES = ("Fixed", "Fit", "1:1")   # Scale at zoom 1.0: preview scale / whole image / full-res pixels
+FIXED_SCALE = 0.55
+
 class AppState:
     def __init__(self):
         self.theme = "dark"
         self.last_output_dir = "" 
         self.window_geometry = "" 
         self.is_maximized = False
+        self.collapse_duplicates = False
+        self.sort_key = "Name"
+        self.filter_key = "All"
+        self.rank_by_score = False
+        self.show_overlays = False
+        self.key_rules = []
+        self.zoom_mode = "Fixed"
     
     def load_settings(self, filepath=CONFIG_FILE):
         if os.path.exists(filepath):
@@ -25,6 +51,13 @@ class AppState:
                     self.last_output_dir = data.get("output_dir", "")
                     self.window_geometry = data.get("window_geometry", "")
                     self.is_maximized = data.get("is_maximized", False)
+                    self.collapse_duplicates = data.get("collapse_duplicates", False)
+                    self.sort_key = data.get("sort_key", "Name")
+                    self.filter_key = data.get("filter_key", "All")
+                    self.rank_by_score = data.get("rank_by_score", False)
+                    self.show_overlays = data.get("show_overlays", False)
+                    self.key_rules = data.get("key_rules", [])
+                    self.zoom_mode = data.get("zoom_mode", "Fixed")
             except Exception:
                 # Silent fail on load is usually preferred (use defaults)
                 pass
@@ -36,7 +69,14 @@ class AppState:
                     "theme": self.theme,
                     "output_dir": self.last_output_dir,
                     "window_geometry": self.window_geometry,
-                    "is_maximized": self.is_maximized
+                    "is_maximized": self.is_maximized,
+                    "collapse_duplicates": self.collapse_duplicates,
+                    "sort_key": self.sort_key,
+                    "filter_key": self.filter_key,
+                    "rank_by_score": self.rank_by_score,
+                    "show_overlays": self.show_overlays,
+                    "key_rules": self.key_rules,
+                    "zoom_mode": self.zoom_mode
                 }
                 json.dump(data, f, indent=4)
             return True, ""
@@ -47,11 +87,97 @@ class AppState:
         self.theme = "light" if self.theme == "dark" else "dark"
         return self.theme
 
+class KeyRules:
+    """
+    User-defined rules that turn a file name (lowercase, no extension) into
+    the key files are matched on. One rule per line, applied in order:
+
+        regex:<pattern>   keep the first capture group (or the whole match)
+        strip:<suffix>    remove a trailing suffix, e.g. strip:_edit
+        counters          remove trailing counters: _00001_, -3, (2), " 12"
+
+    Lines that are empty or start with # are ignored. Everything is compiled
+    once, so applying the rules costs a few regex calls per file.
+    """
+    COUNTER_PATTERN = r"(?:[_\-\s]+\d+|\s*\(\d+\))+_?$"
+
+    def __init__(self, lines=()):
+        self.lines = [l.strip() for l in lines if l.strip() and not l.strip().startswith("#")]
+        self._steps = [self._compile(l) for l in self.lines]
+
+    @classmethod
+    def _compile(cls, line):
+        kind, _, arg = line.partition(":")
+        kind = kind.strip().lower()
+        try:
+            if kind == "regex":
+                pattern = re.compile(arg.strip())
+                def step(name):
+                    m = pattern.search(name)
+                    if not m:
+                        return name
+                    return m.group(1) if pattern.groups else m.group(0)
+                return step
+            if kind == "strip":
+                pattern = re.compile(re.escape(arg.strip().lower()) + "$")
+                return lambda name: pattern.sub("", name)
+            if kind == "counters":
+                pattern = re.compile(cls.COUNTER_PATTERN)
+                return lambda name: pattern.sub("", name)
+        except re.error as e:
+            raise ValueError(f"Invalid pattern in rule '{line}': {e}")
+        raise ValueError(f"Unknown rule '{line}'. Use regex:, strip: or counters.")
+
+    def __bool__(self):
+        return bool(self._steps)
+
+    def key(self, name):
+        for step in self._steps:
+            name = step(name)
+        # A rule must never collapse a name into nothing
+        return name or None
+
+    def apply(self, names):
+        """Bulk version of key(); unmatched names fall back to themselves."""
+        if not self._steps:
+            return list(names)
+        return [self.key(n) or n for n in names]
+
+class KeyIndex:
+    """Sorted table of matching keys for prefix and fuzzy lookups."""
+    FUZZY_WINDOW = 200
+
+    def __init__(self, keys):
+        self.keys = sorted(keys)
+
+    def prefix(self, text, limit=50):
+        text = text.lower()
+        i = bisect.bisect_left(self.keys, text)
+        found = []
+        while i < len(self.keys) and self.keys[i].startswith(text) and len(found) < limit:
+            found.append(self.keys[i])
+            i += 1
+        return found
+
+    def find(self, text, limit=10, cutoff=0.6):
+        """Exact or prefix hits first, otherwise the closest keys by similarity."""
+        text = text.lower().strip()
+        if not text:
+            return []
+        found = self.prefix(text, limit)
+        if found:
+            return found
+        # Typos usually keep the start of a name, so the closest keys sit
+        # around the insertion point; compare against that window only
+        i = bisect.bisect_left(self.keys, text)
+        window = self.keys[max(0, i - self.FUZZY_WINDOW):i + self.FUZZY_WINDOW]
+        return difflib.get_close_matches(text, window, n=limit, cutoff=cutoff)
+
 class FileScanner:
     @staticmethod
-    def scan(folders):
+    def scan(folders, rules=None):
         """
-        Scans folders.
+        Scans folders. Optional KeyRules decide which names count as the same.
         Returns: (grouped_files, sorted_basenames, total_files, error_list)
         """
         if not folders:
@@ -67,13 +193,13 @@ class FileScanner:
                 continue
                 
             try:
-                files = os.listdir(folder)
-                for f in files:
-                    if f.lower().endswith(VALID_EXTENSIONS):
-                        basename = os.path.splitext(f)[0].lower()
-                        if basename not in temp_map: temp_map[basename] = []
-                        temp_map[basename].append(os.path.join(folder, f))
-                        total_files += 1
+                files = [f for f in os.listdir(folder) if f.lower().endswith(VALID_EXTENSIONS)]
+                stems = [os.path.splitext(f)[0].lower() for f in files]
+                keys = rules.apply(stems) if rules else stems
+                for f, basename in zip(files, keys):
+                    if basename not in temp_map: temp_map[basename] = []
+                    temp_map[basename].append(os.path.join(folder, f))
+                total_files += len(files)
             except Exception as e:
                 # Collect error string instead of printing
                 error_list.append(f"Error reading '{os.path.basename(folder)}': {str(e)}")
@@ -83,22 +209,192 @@ class FileScanner:
         
         return grouped_files, sorted_basenames, total_files, error_list
 
+    @staticmethod
+    def find_duplicates(grouped_files):
+        """
+        Finds byte-identical files within and across sets.
+        Stages: file size, then a hash of sampled blocks, then a full hash
+        for files whose samples collide.
+        Returns: {path: canonical_path} for every file that has an identical
+        copy (the canonical path maps to itself).
+        """
+        by_size = {}
+        for paths in grouped_files.values():
+            for p in paths:
+                try:
+                    by_size.setdefault(os.path.getsize(p), []).append(p)
+                except OSError:
+                    continue
+
+        duplicates = {}
+        for size, same_size in by_size.items():
+            if len(same_size) < 2:
+                continue
+            for candidates in _bucket(same_size, lambda p: _sample_digest(p, size)):
+                for identical in _bucket(candidates, _full_digest):
+                    for p in identical:
+                        duplicates[p] = identical[0]
+        return duplicates
+
+def _bucket(paths, digest):
+    """Groups paths by digest. Yields only groups of two or more."""
+    buckets = {}
+    for p in paths:
+        try:
+            buckets.setdefault(digest(p), []).append(p)
+        except OSError:
+            continue
+    for group in buckets.values():
+        if len(group) >= 2:
+            yield group
+
+def _sample_digest(path, size):
+    """Hashes evenly spaced blocks of a file (start, middle, end)."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        if size <= SAMPLE_BLOCK_SIZE * SAMPLE_BLOCKS:
+            h.update(f.read())
+        else:
+            step = (size - SAMPLE_BLOCK_SIZE) // (SAMPLE_BLOCKS - 1)
+            for i in range(SAMPLE_BLOCKS):
+                f.seek(i * step)
+                h.update(f.read(SAMPLE_BLOCK_SIZE))
+    return h.digest()
+
+def _full_digest(path):
+    h = hashlib.blake2b(digest_size=32)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.digest()
+
+def grid_columns(n):
+    """Number of grid columns used to lay out n tiles."""
+    if n > 6: return 4
+    return 3 if n > 4 else (2 if n > 1 else 1)
+
+def page_count(total, per_page=TILES_PER_PAGE):
+    return max(1, -(-total // per_page))
+
+def page_range(total, page, per_page=TILES_PER_PAGE):
+    """Returns the (start, stop) slice of a page, clamped to the item count."""
+    start = min(max(page, 0), page_count(total, per_page) - 1) * per_page
+    return start, min(start + per_page, total)
+
+def tiles_per_window(total, windows, per_page=TILES_PER_PAGE):
+    """Tiles each viewer window shows: the set is split evenly over the windows, at most per_page each."""
+    return max(1, min(per_page, -(-total // max(windows, 1))))
+
+def visible_region(img_w, img_h, scale, pan_x, pan_y, canvas_w, canvas_h):
+    """
+    Maps the canvas viewport back onto an image drawn centred at `scale` and
+    shifted by the pan offset.
+    Returns: (crop_box, (x, y), (w, h)) - the source pixels that are on screen,
+    where to draw them and at what size - or None if nothing is visible.
+    """
+    nw, nh = int(img_w * scale), int(img_h * scale)
+    if nw <= 0 or nh <= 0:
+        return None
+    x0 = canvas_w // 2 - nw // 2 + pan_x
+    y0 = canvas_h // 2 - nh // 2 + pan_y
+
+    vx0, vx1 = max(0, x0), min(canvas_w, x0 + nw)
+    vy0, vy1 = max(0, y0), min(canvas_h, y0 + nh)
+    if vx0 >= vx1 or vy0 >= vy1:
+        return None
+
+    # Whole source pixels covering the visible part
+    sx0 = max(0, math.floor((vx0 - x0) / scale))
+    sy0 = max(0, math.floor((vy0 - y0) / scale))
+    sx1 = min(img_w, math.ceil((vx1 - x0) / scale))
+    sy1 = min(img_h, math.ceil((vy1 - y0) / scale))
+
+    dx = x0 + round(sx0 * scale)
+    dy = y0 + round(sy0 * scale)
+    dw = max(1, round((sx1 - sx0) * scale))
+    dh = max(1, round((sy1 - sy0) * scale))
+    return (sx0, sy0, sx1, sy1), (dx, dy), (dw, dh)
+
+def base_scale(mode, img_w, img_h, full_w, canvas_w, canvas_h, fixed=FIXED_SCALE):
+    """
+    Scale of a preview (img_w x img_h, full_w wide at full resolution) at zoom 1.0.
+    Fixed: the same preview scale for every tile. Fit: the whole image in the canvas.
+    1:1: one full-resolution pixel per screen pixel, so mixed resolutions keep their true sizes.
+    """
+    if img_w <= 0 or img_h <= 0:
+        return fixed
+    if mode == "Fit" and canvas_w > 1 and canvas_h > 1:
+        return min(canvas_w / img_w, canvas_h / img_h)
+    if mode == "1:1" and full_w > 0:
+        return full_w / img_w
+    return fixed
+
+def pan_offset(center, disp_w, disp_h):
+    """
+    Pixel pan that puts the normalized image point center (0..1, 0..1) in the
+    middle of the canvas, for an image drawn disp_w x disp_h (see visible_region).
+    """
+    return round((0.5 - center[0]) * disp_w), round((0.5 - center[1]) * disp_h)
+
+def collapse_duplicates(paths, duplicates):
+    """
+    Keeps one path per distinct content, in order.
+    Returns: (unique_paths, copies) where copies maps each kept path to the
+    number of identical files it stands for.
+    """
+    unique_paths = []
+    copies = {}
+    kept = {}
+    for p in paths:
+        canonical = duplicates.get(p, p)
+        if canonical in kept:
+            copies[kept[canonical]] += 1
+        else:
+            kept[canonical] = p
+            unique_paths.append(p)
+            copies[p] = 1
+    return unique_paths, copies
+
 class FileManager:
     @staticmethod
-    def copy_to_output(source_path, output_dir):
+    def copy_file(source_path, output_dir):
+        """
+        Copies a file into output_dir without overwriting. Returns the destination path, raises on failure.
+        The destination is created exclusively, so two copies of same-named files can never pick one name.
+        """
         if not output_dir or not os.path.exists(output_dir):
-            return False, "Output directory not set or does not exist."
-            
+            raise FileNotFoundError("Output directory not set or does not exist.")
+
+        filename = os.path.basename(source_path)
+        name, ext = os.path.splitext(filename)
+        timestamp = int(time.time())
+        with open(source_path, "rb") as src:
+            for attempt in itertools.count():
+                if attempt == 0:
+                    candidate = filename
+                elif attempt == 1:
+                    candidate = f"{name}_{timestamp}{ext}"
+                else:
+                    candidate = f"{name}_{timestamp}_{attempt}{ext}"
+                destination = os.path.join(output_dir, candidate)
+                try:
+                    dst = open(destination, "xb")
+                except FileExistsError:
+                    continue
+                try:
+                    with dst:
+                        shutil.copyfileobj(src, dst, COPY_CHUNK)
+                    shutil.copystat(source_path, destination)
+                except BaseException:
+                    # Never leave a truncated copy behind
+                    os.remove(destination)
+                    raise
+                return destination
+
+    @staticmethod
+    def copy_to_output(source_path, output_dir):
         try:
-            filename = os.path.basename(source_path)
-            destination = os.path.join(output_dir, filename)
-            
-            if os.path.exists(destination):
-                name, ext = os.path.splitext(filename)
-                timestamp = int(time.time())
-                destination = os.path.join(output_dir, f"{name}_{timestamp}{ext}")
-
-            shutil.copy2(source_path, destination)
+            destination = FileManager.copy_file(source_path, output_dir)
             return True, f"Saved to {os.path.basename(destination)}"
         except Exception as e:
             return False, str(e)
\ No newline at end of file
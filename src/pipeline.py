@@ -0,0 +1,320 @@
+import io
+import mmap
+import os
+import queue
+import threading
+import itertools
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image, ImageOps
+import rawpy
+
+# --- ROBUST IMPORT FOR LOGIC ---
+try:
+    from src.logic import RAW_EXTS
+except ImportError:
+    from .logic import RAW_EXTS
+
+# Pipeline sizing
+IO_WORKERS = 4                                  # Reads kept in flight (NAS latency hiding)
+DECODE_WORKERS = max(2, min(4, os.cpu_count() or 2))
+MAX_PENDING_BUFFERS = 6                         # Read-but-not-decoded files (backpressure)
+MMAP_THRESHOLD = 4 * 1024 * 1024                # Files this big are memory-mapped
+TAG_ORIENTATION = 0x0112
+PREVIEW_CACHE_ITEMS = 36                        # Previews kept: visible page + neighbours
+
+# Request priorities (lower runs first)
+PRIORITY_VISIBLE = 0
+PRIORITY_PREFETCH = 1
+_PRIORITY_STOP = 99
+
+
+def read_buffer(path, use_mmap=True):
+    """
+    I/O stage: pulls a whole file into memory and returns a file-like object.
+    Large files are memory-mapped and their pages faulted in here, so the
+    decoder never waits on the disk or the network.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if use_mmap and size >= MMAP_THRESHOLD:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if hasattr(mm, "madvise") and hasattr(mmap, "MADV_WILLNEED"):
+                mm.madvise(mmap.MADV_WILLNEED)
+            # Touch one byte per page so the read happens on this thread
+            for offset in range(0, size, mmap.PAGESIZE):
+                mm[offset]
+            return mm
+        return io.BytesIO(f.read())
+
+
+def decode_buffer(path, buf):
+    """Decode stage: turns an in-memory file into a fully loaded PIL image."""
+    if path.lower().endswith(RAW_EXTS):
+        with rawpy.imread(buf) as raw:
+            rgb = raw.postprocess(use_camera_wb=True)
+            return Image.fromarray(rgb)
+
+    img = Image.open(buf)
+    img.load()
+    # RAW output is already rotated by LibRaw; everything else honours EXIF
+    if img.getexif().get(TAG_ORIENTATION, 1) != 1:
+        img = ImageOps.exif_transpose(img)
+    return img
+
+
+class RawBuffers:
+    """Scratch space for the RAW preview path, grown as needed and reused for every file."""
+
+    def __init__(self):
+        self._acc = np.empty(0, dtype=np.uint32)
+
+    def accumulator(self, shape):
+        n = int(np.prod(shape))
+        if self._acc.size < n:
+            self._acc = np.empty(n, dtype=np.uint32)
+        return self._acc[:n].reshape(shape)
+
+
+_thread_buffers = threading.local()   # One RawBuffers per decoder thread
+
+
+def downscale_rgb16(rgb, factor, buffers=None):
+    """
+    Box-filters a 16-bit RGB array by an integer factor and converts it to 8 bits.
+    Sums are accumulated in place in a reused buffer, reading strided views of
+    rgb (no copies of the input). The only new array is the (h, w, 4) uint8
+    RGBA result, laid out so PIL can wrap it without copying.
+    """
+    h, w = rgb.shape[0] // factor, rgb.shape[1] // factor
+    out = np.empty((h, w, 4), dtype=np.uint8)
+    out[..., 3] = 255
+    if factor == 1:
+        # Nothing to sum: 16 -> 8 bit straight into the result
+        np.floor_divide(rgb, 257, out=out[..., :3], casting="unsafe")
+        return out
+
+    if buffers is None:
+        buffers = getattr(_thread_buffers, "value", None) or RawBuffers()
+        _thread_buffers.value = buffers
+    acc = buffers.accumulator((h, w, 3))
+    for dy in range(factor):
+        for dx in range(factor):
+            part = rgb[dy:h * factor:factor, dx:w * factor:factor]
+            if dy == 0 and dx == 0:
+                np.copyto(acc, part)
+            else:
+                np.add(acc, part, out=acc)
+
+    # Mean of factor^2 samples, 16 -> 8 bit, rounded
+    div = factor * factor * 257
+    np.add(acc, div // 2, out=acc)
+    np.floor_divide(acc, div, out=acc)
+    np.copyto(out[..., :3], acc, casting="unsafe")
+    return out
+
+
+def rgb16_preview(rgb, max_side):
+    """
+    Preview of a 16-bit RGB array at the size make_preview gives other files
+    (long side max_side), so RAW and JPEG siblings line up. The integer box
+    filter does the bulk of the reduction, one resize covers the remainder.
+    """
+    h, w = rgb.shape[:2]
+    factor = max(1, max(h, w) // max_side)
+    out = downscale_rgb16(rgb, factor)
+    oh, ow = out.shape[:2]
+    # RGBA is one of the modes PIL shares with the array instead of copying
+    img = Image.frombuffer("RGBA", (ow, oh), out, "raw", "RGBA", 0, 1)
+    if max(w, h) > max_side:
+        ratio = max_side / max(w, h)
+        size = (max(1, int(w * ratio)), max(1, int(h * ratio)))
+        if size != img.size:
+            img = img.resize(size, Image.Resampling.LANCZOS)
+    return img
+
+
+def decode_raw_preview(buf, max_side):
+    """
+    RAW decode straight to a preview with a long side of max_side, the same
+    size make_preview gives other files. Sensors at least twice that size
+    skip demosaicing via half_size; the 16-bit output is then reduced by
+    rgb16_preview.
+    """
+    with rawpy.imread(buf) as raw:
+        half = max(raw.sizes.width, raw.sizes.height) >= 2 * max_side
+        rgb = raw.postprocess(use_camera_wb=True, half_size=half, output_bps=16)
+    return rgb16_preview(rgb, max_side)
+
+
+def load_image(path):
+    """Reads and decodes a single file on the calling thread."""
+    buf = read_buffer(path)
+    try:
+        return decode_buffer(path, buf)
+    finally:
+        buf.close()
+
+
+def make_preview(img, max_side):
+    """Downsamples an image so its long side is at most max_side pixels."""
+    w, h = img.size
+    if w > max_side or h > max_side:
+        ratio = min(max_side / w, max_side / h)
+        nw, nh = max(1, int(w * ratio)), max(1, int(h * ratio))
+        # Use a high-quality filter once for the cache image
+        return img.resize((nw, nh), Image.Resampling.LANCZOS)
+    return img
+
+
+class PreviewCache:
+    """
+    Thread-safe LRU of decoded previews keyed by content (canonical path), so
+    byte-identical files share one decode.
+    """
+
+    def __init__(self, max_items=PREVIEW_CACHE_ITEMS):
+        self.max_items = max_items
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class LoadPipeline:
+    """
+    Two-stage image loader.
+
+    I/O threads read upcoming files into memory while decoder threads work on
+    buffers that have already arrived, so network latency overlaps with CPU
+    decode. The buffer queue between the stages is bounded: when decoders fall
+    behind, readers block instead of piling up whole files in RAM.
+    """
+
+    def __init__(self, io_workers=IO_WORKERS, decode_workers=DECODE_WORKERS,
+                 max_pending=MAX_PENDING_BUFFERS, postprocess=None, use_mmap=True, raw_preview_side=None):
+        self.postprocess = postprocess
+        self.use_mmap = use_mmap
+        # Set when only previews are wanted: RAW files then take decode_raw_preview
+        self.raw_preview_side = raw_preview_side
+        self._requests = queue.PriorityQueue()
+        self._order = itertools.count()
+        self._buffers = queue.Queue(maxsize=max_pending)
+        self._closing = threading.Event()
+        self._io_threads = [self._start(self._io_loop) for _ in range(io_workers)]
+        self._decode_threads = [self._start(self._decode_loop) for _ in range(decode_workers)]
+
+    @staticmethod
+    def _start(target):
+        t = threading.Thread(target=target, daemon=True)
+        t.start()
+        return t
+
+    def submit(self, path, callback, priority=PRIORITY_VISIBLE, job=None):
+        """
+        Queues a file. callback(path, result) is invoked on a worker thread;
+        result is None if the file could not be read or decoded.
+        Lower priorities are read first; equal priorities keep FIFO order.
+        Once job (anything with a `cancelled` flag) is cancelled, the file is
+        dropped before the next stage and callback is not called.
+        """
+        self._requests.put((priority, next(self._order), path, callback, job))
+
+    def load(self, paths):
+        """Loads several files concurrently. Returns results in input order."""
+        results = [None] * len(paths)
+        if not paths:
+            return results
+
+        remaining = [len(paths)]
+        lock = threading.Lock()
+        done = threading.Event()
+
+        def collect(index):
+            def callback(path, result):
+                results[index] = result
+                with lock:
+                    remaining[0] -= 1
+                    if remaining[0] == 0:
+                        done.set()
+            return callback
+
+        for i, p in enumerate(paths):
+            self.submit(p, collect(i))
+        done.wait()
+        return results
+
+    def shutdown(self):
+        """Stops all workers. Work still queued is dropped without callbacks, so closing never waits on it."""
+        self._closing.set()
+        for _ in self._io_threads:
+            self._requests.put((_PRIORITY_STOP, next(self._order), None, None, None))
+        for t in self._io_threads:
+            t.join()
+        for _ in self._decode_threads:
+            self._buffers.put(None)
+        for t in self._decode_threads:
+            t.join()
+
+    def _io_loop(self):
+        while True:
+            priority, order, path, callback, job = self._requests.get()
+            if path is None:
+                return
+            if self._closing.is_set() or (job is not None and job.cancelled):
+                continue
+            try:
+                buf = read_buffer(path, self.use_mmap)
+            except Exception as e:
+                print(f"Error reading {path}: {e}")
+                callback(path, None)
+                continue
+            # Blocks while the decoders are behind (backpressure)
+            self._buffers.put((path, buf, callback, job))
+
+    def _decode_loop(self):
+        while True:
+            item = self._buffers.get()
+            if item is None:
+                return
+            path, buf, callback, job = item
+            if self._closing.is_set() or (job is not None and job.cancelled):
+                buf.close()
+                continue
+            result = None
+            try:
+                if self.raw_preview_side and path.lower().endswith(RAW_EXTS):
+                    img = decode_raw_preview(buf, self.raw_preview_side)
+                else:
+                    img = decode_buffer(path, buf)
+                result = self.postprocess(img) if self.postprocess else img
+            except Exception as e:
+                print(f"Error loading {path}: {e}")
+            finally:
+                buf.close()
+            callback(path, result)
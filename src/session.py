@@ -0,0 +1,143 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+
+# --- ROBUST IMPORT FOR LOGIC ---
+try:
+    from src.logic import CACHE_DIR
+except ImportError:
+    from .logic import CACHE_DIR
+
+SESSION_FILE = os.path.join(CACHE_DIR, "session.db")
+FLUSH_INTERVAL = 2.0       # Seconds between journal commits
+FLUSH_BATCH = 25           # ... or sooner, once this many writes are buffered
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS selections (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    basename TEXT NOT NULL,
+    source TEXT NOT NULL,
+    destination TEXT NOT NULL,
+    ts REAL NOT NULL
+);
+"""
+
+
+class SessionJournal:
+    """
+    Crash-safe record of a culling session in SQLite (WAL mode).
+
+    The scan inputs are written once per scan. Position changes and selections
+    are only buffered by the caller's thread; a background thread commits them
+    in batches, so each commit (and its fsync) covers many user actions.
+    """
+
+    def __init__(self, filepath=SESSION_FILE):
+        self.filepath = filepath
+        os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+        self._db = sqlite3.connect(filepath, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=FULL")
+        self._db.executescript(SCHEMA)
+        self._db.commit()
+
+        self._db_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._meta = {}
+        self._selections = []
+        self._closed = False
+        self._thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self._thread.start()
+
+    # --- Writing ---
+
+    def start(self, folders, grouped_files, sorted_basenames, duplicates=None):
+        """Begins a new session: replaces the stored scan and forgets old selections."""
+        rows = {
+            "folders": folders,
+            "grouped_files": grouped_files,
+            "sorted_basenames": sorted_basenames,
+            "duplicates": duplicates or {},
+            "current_index": 0,
+            "started": time.time(),
+        }
+        with self._db_lock, self._db:
+            with self._cond:
+                self._meta.clear()
+                self._selections.clear()
+            self._db.execute("DELETE FROM meta")
+            self._db.execute("DELETE FROM selections")
+            self._db.executemany("INSERT INTO meta (key, value) VALUES (?, ?)",
+                                 [(k, json.dumps(v)) for k, v in rows.items()])
+
+    def set(self, key, value):
+        """Buffers a session value (e.g. current_index); committed with the next batch."""
+        with self._cond:
+            self._meta[key] = value
+            self._notify_if_full()
+
+    def record_selection(self, basename, source, destination):
+        with self._cond:
+            self._selections.append((basename, source, destination, time.time()))
+            self._notify_if_full()
+
+    def flush(self):
+        """Commits everything buffered so far in a single transaction."""
+        # Lock order: database, then buffers (same as start)
+        with self._db_lock:
+            with self._cond:
+                meta, self._meta = self._meta, {}
+                selections, self._selections = self._selections, []
+            if not meta and not selections:
+                return
+            with self._db:
+                self._db.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                                     [(k, json.dumps(v)) for k, v in meta.items()])
+                self._db.executemany("INSERT INTO selections (basename, source, destination, ts) VALUES (?, ?, ?, ?)",
+                                     selections)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        self.flush()
+        with self._db_lock:
+            self._db.close()
+
+    def _notify_if_full(self):
+        if len(self._meta) + len(self._selections) >= FLUSH_BATCH:
+            self._cond.notify_all()
+
+    def _flush_loop(self):
+        while True:
+            with self._cond:
+                if not self._closed:
+                    self._cond.wait(FLUSH_INTERVAL)
+                if self._closed:
+                    return
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print(f"[Session] Could not write journal: {e}")
+
+    # --- Reading ---
+
+    def load(self):
+        """
+        Returns the stored session as a dict (folders, grouped_files,
+        sorted_basenames, duplicates, current_index, selections) or None.
+        """
+        self.flush()
+        with self._db_lock:
+            meta = {k: json.loads(v) for k, v in self._db.execute("SELECT key, value FROM meta")}
+            rows = self._db.execute("SELECT basename, source FROM selections ORDER BY id").fetchall()
+        if not meta.get("sorted_basenames"):
+            return None
+        meta["selections"] = {}
+        for basename, source in rows:
+            meta["selections"][basename] = source
+        return meta
@@ -0,0 +1,161 @@
+import io
+import os
+import hashlib
+import threading
+from collections import deque
+
+from PIL import Image, ImageOps
+import rawpy
+
+# --- ROBUST IMPORT FOR LOGIC / PIPELINE ---
+try:
+    from src.logic import RAW_EXTS, CACHE_DIR
+    from src.pipeline import PreviewCache
+except ImportError:
+    from .logic import RAW_EXTS, CACHE_DIR
+    from .pipeline import PreviewCache
+
+THUMB_SIZE = 128
+THUMB_WORKERS = 3
+THUMB_MEMORY_ITEMS = 1500
+THUMB_QUALITY = 85
+
+# LibRaw flip codes -> PIL transpose
+RAW_FLIPS = {
+    3: Image.Transpose.ROTATE_180,
+    5: Image.Transpose.ROTATE_90,
+    6: Image.Transpose.ROTATE_270,
+}
+
+
+def make_thumbnail(path, size=THUMB_SIZE):
+    """
+    Builds a small RGB thumbnail as cheaply as the format allows:
+    embedded previews for RAW files, reduced-size DCT decoding for JPEG.
+    """
+    if path.lower().endswith(RAW_EXTS):
+        with rawpy.imread(path) as raw:
+            try:
+                thumb = raw.extract_thumb()
+                if thumb.format == rawpy.ThumbFormat.JPEG:
+                    img = Image.open(io.BytesIO(thumb.data))
+                else:
+                    img = Image.fromarray(thumb.data)
+                if raw.sizes.flip in RAW_FLIPS:
+                    img = img.transpose(RAW_FLIPS[raw.sizes.flip])
+            except (rawpy.LibRawNoThumbnailError, rawpy.LibRawUnsupportedThumbnailError):
+                img = Image.fromarray(raw.postprocess(use_camera_wb=True, half_size=True))
+    else:
+        img = Image.open(path)
+        img.draft("RGB", (size, size))
+        img = ImageOps.exif_transpose(img)
+
+    img.thumbnail((size, size), Image.Resampling.BILINEAR)
+    return img.convert("RGB")
+
+
+class ThumbnailCache:
+    """
+    Persistent on-disk thumbnail store. Entries are keyed by path, size and
+    modification time, so edited files get new thumbnails automatically.
+    """
+
+    def __init__(self, cache_dir=None, size=THUMB_SIZE):
+        self.cache_dir = cache_dir or os.path.join(CACHE_DIR, "thumbs")
+        self.size = size
+
+    def entry_path(self, path):
+        st = os.stat(path)
+        key = f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}|{self.size}"
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], digest + ".jpg")
+
+    def get(self, path):
+        try:
+            entry = self.entry_path(path)
+            if os.path.exists(entry):
+                img = Image.open(entry)
+                img.load()
+                return img
+        except Exception:
+            pass
+        return None
+
+    def put(self, path, img):
+        try:
+            entry = self.entry_path(path)
+            os.makedirs(os.path.dirname(entry), exist_ok=True)
+            tmp = entry + ".tmp"
+            img.save(tmp, "JPEG", quality=THUMB_QUALITY)
+            os.replace(tmp, entry)
+        except Exception as e:
+            print(f"[Thumbs] Could not cache {path}: {e}")
+
+
+class ThumbnailService:
+    """
+    Generates thumbnails on worker threads.
+
+    Callers hand over the full list of paths they want, most urgent first
+    (e.g. visible rows, then rows just off screen). Each call replaces the
+    previous wish list, so scrolling away drops work nobody will see.
+    on_ready(path) is called on a worker thread when a thumbnail is available.
+    """
+
+    def __init__(self, on_ready=None, cache=None, workers=THUMB_WORKERS):
+        self.on_ready = on_ready
+        self.cache = cache or ThumbnailCache()
+        self.memory = PreviewCache(max_items=THUMB_MEMORY_ITEMS)
+        self._pending = deque()
+        self._in_flight = set()
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._threads = []
+        for _ in range(workers):
+            t = threading.Thread(target=self._worker_loop, daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def get(self, path):
+        """Returns the thumbnail if it is already in memory, else None."""
+        return self.memory.get(path)
+
+    def request(self, paths):
+        """Replaces the pending work with paths, in priority order."""
+        with self._cond:
+            self._pending = deque(p for p in dict.fromkeys(paths)
+                                  if p not in self.memory and p not in self._in_flight)
+            self._cond.notify_all()
+
+    def shutdown(self):
+        with self._cond:
+            self._stopped = True
+            self._pending.clear()
+            self._cond.notify_all()
+        for t in self._threads:
+            t.join()
+
+    def _worker_loop(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                path = self._pending.popleft()
+                self._in_flight.add(path)
+
+            try:
+                img = self.cache.get(path)
+                if img is None:
+                    img = make_thumbnail(path, self.cache.size)
+                    self.cache.put(path, img)
+            except Exception as e:
+                print(f"[Thumbs] Error creating thumbnail for {path}: {e}")
+                img = Image.new("RGB", (self.cache.size, self.cache.size), "gray")
+
+            self.memory.put(path, img)
+            with self._cond:
+                self._in_flight.discard(path)
+            if self.on_ready:
+                self.on_ready(path)
@@ -0,0 +1,178 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+# --- ROBUST IMPORT FOR PIPELINE ---
+try:
+    from src.pipeline import load_image
+except ImportError:
+    from .pipeline import load_image
+
+TILE_SIZE = 512
+TILE_CACHE_BYTES = 1024 * 1024 * 1024   # Full-resolution pixels kept across all images
+TILE_WORKERS = 2
+
+
+def tiles_for(box, tile=TILE_SIZE):
+    """Tile coordinates (tx, ty) covering a (left, top, right, bottom) pixel box."""
+    x0, y0, x1, y1 = box
+    return [(tx, ty)
+            for ty in range(y0 // tile, (y1 - 1) // tile + 1)
+            for tx in range(x0 // tile, (x1 - 1) // tile + 1)]
+
+
+class TileCache:
+    """Thread-safe LRU of image tiles with a budget in bytes rather than items."""
+
+    def __init__(self, max_bytes=TILE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self._tiles = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _cost(tile):
+        return tile.width * tile.height * len(tile.getbands())
+
+    def get(self, key):
+        with self._lock:
+            tile = self._tiles.get(key)
+            if tile is not None:
+                self._tiles.move_to_end(key)
+            return tile
+
+    def put(self, key, tile):
+        with self._lock:
+            old = self._tiles.pop(key, None)
+            if old is not None:
+                self.used_bytes -= self._cost(old)
+            self._tiles[key] = tile
+            self.used_bytes += self._cost(tile)
+            self._evict()
+
+    def resize(self, max_bytes):
+        """Changes the budget, evicting least recently used tiles right away if it shrank."""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def _evict(self):
+        # Caller holds the lock. The newest tile always stays, even if it alone is over budget.
+        while self.used_bytes > self.max_bytes and len(self._tiles) > 1:
+            _, evicted = self._tiles.popitem(last=False)
+            self.used_bytes -= self._cost(evicted)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._tiles
+
+    def __len__(self):
+        with self._lock:
+            return len(self._tiles)
+
+
+class TileLoader:
+    """
+    Full-resolution detail for zoom levels past the cached preview.
+
+    A file is decoded once and cut into TILE_SIZE tiles, nearest to the
+    requested viewport first, until the file's share of the budget is used;
+    then the decode is released and only the tiles stay, in a byte-budgeted
+    LRU. Tiles under the viewports are touched on every redraw, so it is
+    far-away detail that is evicted first, not what is on screen.
+    on_ready(path) is called on a worker thread when a file's tiles are in.
+    """
+
+    def __init__(self, on_ready=None, decode=load_image, cache=None,
+                 workers=TILE_WORKERS, tile=TILE_SIZE):
+        self.on_ready = on_ready
+        self.decode = decode
+        self.cache = cache or TileCache()
+        self.tile = tile
+        self.sizes = {}      # path -> full-resolution (w, h) once decoded
+        self._pending = {}     # path -> (box, share, job) of the latest request, until it is decoded
+        self._failed = set()   # Undecodable files are not retried on every redraw
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+
+    def assemble(self, path, box):
+        """Builds the pixels of box from cached tiles, or None if any tile is missing."""
+        x0, y0, x1, y1 = box
+        coords = tiles_for(box, self.tile)
+        tiles = [self.cache.get((path, tx, ty)) for tx, ty in coords]
+        if any(t is None for t in tiles):
+            return None
+        if len(tiles) == 1:
+            tx, ty = coords[0]
+            return tiles[0].crop((x0 - tx * self.tile, y0 - ty * self.tile,
+                                  x1 - tx * self.tile, y1 - ty * self.tile))
+        out = Image.new(tiles[0].mode, (x1 - x0, y1 - y0))
+        for (tx, ty), t in zip(coords, tiles):
+            out.paste(t, (tx * self.tile - x0, ty * self.tile - y0))
+        return out
+
+    def request(self, path, box, share=None, job=None):
+        """
+        Queues a decode of path around box unless one is already queued or running.
+        share caps the bytes of tiles kept from this file (default: whole budget),
+        so several files zoomed together do not evict each other's viewports.
+        Once job (anything with a `cancelled` flag) is cancelled, a decode that
+        has not started is skipped; a newer request for the same file revives it.
+        """
+        with self._lock:
+            if path in self._failed:
+                return
+            queued = path in self._pending
+            self._pending[path] = (box, share or self.cache.max_bytes, job)
+        if not queued:
+            self._pool.submit(self._load, path)
+
+    def busy(self):
+        with self._lock:
+            return bool(self._pending)
+
+    def shutdown(self, wait=False):
+        self._pool.shutdown(wait=wait)
+
+    def _load(self, path):
+        with self._lock:
+            box, share, job = self._pending[path]
+            if job is not None and job.cancelled:
+                # Skipped set or page: leave the decoder to work that is still on screen
+                del self._pending[path]
+                return
+        try:
+            img = self.decode(path)
+            self.sizes[path] = img.size
+            keep = self._nearest(img.size, box, len(img.getbands()), share)
+            # Farthest first: the viewport's own tiles end up most recently used
+            for tx, ty in reversed(keep):
+                x, y = tx * self.tile, ty * self.tile
+                tile = img.crop((x, y, min(x + self.tile, img.width), min(y + self.tile, img.height)))
+                tile.load()
+                self.cache.put((path, tx, ty), tile)
+        except Exception as e:
+            print(f"[Tiles] Error loading {path}: {e}")
+            with self._lock:
+                self._failed.add(path)
+        finally:
+            # Notify before leaving pending: a poller that sees busy() == False has the news
+            if self.on_ready:
+                self.on_ready(path)
+            with self._lock:
+                self._pending.pop(path, None)
+
+    def _nearest(self, size, box, bands, share):
+        """Tiles of the image ordered by distance from box, cut off at share bytes."""
+        cols = -(-size[0] // self.tile)
+        rows = -(-size[1] // self.tile)
+        wanted = set(tiles_for(box, self.tile))
+        cx = (box[0] + box[2]) / 2 / self.tile
+        cy = (box[1] + box[3]) / 2 / self.tile
+        coords = sorted(((tx, ty) for ty in range(rows) for tx in range(cols)),
+                        key=lambda c: (c not in wanted, max(abs(c[0] + 0.5 - cx), abs(c[1] + 0.5 - cy))))
+        tile_bytes = self.tile * self.tile * bands
+        limit = max(len(wanted), share // tile_bytes)
+        return coords[:limit]
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+from PIL import Image, ImageFilter
+from src.analysis import laplacian_variance, clipping, noise_sigma, score_file, score_files, compute_overlay
+from src.index import ScanIndex
+
+# --- HELPER FIXTURES ---
+
+@pytest.fixture
+def sharp_and_blurry(tmp_path):
+    rng = np.random.default_rng(0)
+    pattern = Image.fromarray((rng.random((256, 256)) > 0.5).astype(np.uint8) * 200 + 20)
+    sharp = tmp_path / "sharp.png"
+    blurry = tmp_path / "blurry.png"
+    pattern.save(sharp)
+    pattern.filter(ImageFilter.GaussianBlur(4)).save(blurry)
+    return str(sharp), str(blurry)
+
+# --- MEASURES ---
+
+def test_laplacian_variance_flat_is_zero():
+    assert laplacian_variance(np.full((50, 50), 128, np.float32)) == 0.0
+
+def test_clipping_fractions():
+    gray = np.zeros((10, 10), np.float32)
+    gray[:2] = 255
+    gray[2:5] = 100
+    high, low = clipping(gray)
+    assert high == pytest.approx(0.2)
+    assert low == pytest.approx(0.5)
+
+def test_noise_estimate_tracks_added_noise():
+    rng = np.random.default_rng(1)
+    ramp = np.tile(np.linspace(0, 200, 300, dtype=np.float32), (300, 1))
+    assert noise_sigma(ramp) < 0.5
+    noisy = ramp + rng.normal(0, 10, ramp.shape).astype(np.float32)
+    assert noise_sigma(noisy) == pytest.approx(10, rel=0.15)
+
+# --- FILES ---
+
+def test_sharp_scores_higher(sharp_and_blurry):
+    sharp, blurry = sharp_and_blurry
+    assert score_file(sharp).sharpness > score_file(blurry).sharpness
+    assert score_file(sharp).score > score_file(blurry).score
+
+def test_pool_scores_and_index_ranking(sharp_and_blurry, tmp_path):
+    sharp, blurry = sharp_and_blurry
+    broken = tmp_path / "broken.png"
+    broken.write_text("nope")
+    paths = [blurry, sharp, str(broken)]
+
+    scores = score_files(paths, workers=2)
+    assert set(scores) == {sharp, blurry}
+
+    index = ScanIndex([str(tmp_path)])
+    index.refresh(paths)
+    index.scores.update(scores)
+    assert index.best(paths) == sharp
+    assert index.rank(paths) == [sharp, blurry, str(broken)]
+    assert index.unscored(paths) == [str(broken)]
+
+    filepath = str(tmp_path / "index.json")
+    index.save(filepath)
+    assert ScanIndex.load([str(tmp_path)], filepath).scores == index.scores
+
+# --- OVERLAYS ---
+
+def test_overlay_marks_clipped_pixels():
+    rgb = np.full((20, 30, 3), 128, np.uint8)
+    rgb[:5, :, 0] = 255      # blown red channel
+    rgb[-5:] = 0             # crushed shadows
+    overlay = compute_overlay(Image.fromarray(rgb))
+
+    assert overlay.mask.mode == "P"
+    mask = np.asarray(overlay.mask.convert("RGBA"))
+    assert mask.shape == (20, 30, 4)
+    assert tuple(mask[0, 0]) == (255, 0, 0, 170)
+    assert tuple(mask[-1, 0]) == (0, 90, 255, 170)
+    assert mask[10, 10, 3] == 0
+    assert overlay.histogram.size == (256, 80)
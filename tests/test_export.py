@@ -0,0 +1,50 @@
+import os
+import pytest
+from PIL import Image
+from src.export import export_contact_sheets, render_contact_sheet, sheet_filename, SHEET_PAD, TITLE_HEIGHT
+from src.thumbnails import ThumbnailCache
+
+# --- HELPER FIXTURES ---
+
+@pytest.fixture
+def sets(tmp_path):
+    result = []
+    for name, count in (("alpha", 2), ("beta", 5), ("gamma", 7)):
+        paths = []
+        for f in range(count):
+            folder = tmp_path / f"folder_{f}"
+            folder.mkdir(exist_ok=True)
+            p = folder / f"{name}.png"
+            Image.new("RGB", (200, 100), (f * 30, 80, 160)).save(p)
+            paths.append(str(p))
+        result.append((name, paths))
+    return result
+
+# --- SHEETS ---
+
+def test_sheet_uses_grid_layout_rules(sets, tmp_path):
+    cache = ThumbnailCache(cache_dir=str(tmp_path / "cache"), size=50)
+    widths = {}
+    for name, paths in sets:
+        sheet = render_contact_sheet(name, paths, tile=50, cache=cache)
+        widths[name] = sheet.width
+    # 2 files -> 2 columns, 5 -> 3 columns, 7 -> 4 columns
+    cell = 50 + SHEET_PAD
+    assert widths == {"alpha": 2 * cell + SHEET_PAD, "beta": 3 * cell + SHEET_PAD, "gamma": 4 * cell + SHEET_PAD}
+    # Thumbnails were cached for the next export
+    assert cache.get(sets[0][1][0]) is not None
+
+def test_export_writes_one_sheet_per_set(sets, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # Keep the default thumbnail cache inside tmp_path
+    out_dir = tmp_path / "sheets"
+    progress = []
+    written, errors = export_contact_sheets(sets, str(out_dir), tile=40, workers=2,
+                                            on_progress=lambda d, t: progress.append((d, t)))
+    assert errors == []
+    assert sorted(os.path.basename(p) for p in written) == ["alpha.jpg", "beta.jpg", "gamma.jpg"]
+    assert progress[-1] == (3, 3)
+    with Image.open(out_dir / "gamma.jpg") as sheet:
+        assert sheet.height == TITLE_HEIGHT + 2 * (40 + 24 + SHEET_PAD) + SHEET_PAD
+
+def test_sheet_filename_is_safe():
+    assert sheet_filename('a/b:c*?') == "a_b_c_.jpg"
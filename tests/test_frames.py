@@ -0,0 +1,53 @@
+import pytest
+from PIL import Image
+from src.frames import FrameStore, probe, DEFAULT_DURATION, MIN_DURATION
+
+# --- HELPER FIXTURES ---
+
+@pytest.fixture
+def animation(tmp_path):
+    p = tmp_path / "anim.gif"
+    frames = [Image.new("RGB", (60, 40), (i * 50, 0, 0)) for i in range(5)]
+    frames[0].save(p, save_all=True, append_images=frames[1:], duration=[40, 80, 10, 40, 40], loop=0)
+    return str(p)
+
+# --- PROBE ---
+
+def test_probe_counts_frames(animation, tmp_path):
+    still = tmp_path / "still.png"
+    Image.new("RGB", (10, 10)).save(still)
+    assert probe(animation) == 5
+    assert probe(str(still)) == 1
+    assert probe(str(tmp_path / "photo.jpg")) == 1    # Not even opened
+
+# --- FRAME STORE ---
+
+def test_decode_ahead_and_durations(animation):
+    store = FrameStore(animation, 5, max_side=30)
+    assert store.missing(3, 4) == [3, 4, 0, 1]
+    assert store.decode([3, 4, 0, 1]) == [3, 4, 0, 1]
+    assert store.get(3).size == (30, 20)
+    assert store.get(3).getpixel((0, 0))[0] == 150
+    assert store.get(8) is store.get(3)                # Wraps around
+    assert store.duration(1) == 80
+    assert store.duration(2) == DEFAULT_DURATION       # Not decoded yet
+    assert store.missing(0, 5) == [2]
+    store.decode([2])
+    assert store.duration(2) == MIN_DURATION           # 10 ms is raised to the floor
+    store.close()
+
+def test_cached_frames_skip_the_decoder(animation):
+    store = FrameStore(animation, 5, max_side=60)
+    store.decode([0, 1, 2, 3, 4])
+    store.close()
+    # Decoder gone: scrubbing anywhere still works from the cache
+    assert store.decode([4, 2, 0]) == []
+    assert store.get(2).getpixel((0, 0))[0] == 100
+
+def test_frame_budget_evicts_oldest(animation):
+    store = FrameStore(animation, 5, max_side=60, max_bytes=2 * 60 * 40 * 4)
+    store.decode([0, 1, 2])
+    assert store.get(0) is None and store.get(2) is not None
+    # An evicted frame is decoded again (seeking back)
+    assert store.decode([0]) == [0]
+    store.close()
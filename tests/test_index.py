@@ -0,0 +1,84 @@
+import os
+import pytest
+from PIL import Image
+from src.index import ScanIndex, read_header, TAG_ORIENTATION, TAG_MAKE, TAG_MODEL, TAG_EXIF_IFD, TAG_DATETIME_ORIGINAL
+
+# --- HELPER FIXTURES ---
+
+def save_jpeg(path, size, orientation=1, taken=None, make=None, model=None):
+    exif = Image.Exif()
+    exif[TAG_ORIENTATION] = orientation
+    if make: exif[TAG_MAKE] = make
+    if model: exif[TAG_MODEL] = model
+    if taken: exif.get_ifd(TAG_EXIF_IFD)[TAG_DATETIME_ORIGINAL] = taken
+    Image.new("RGB", size).save(path, exif=exif)
+    return str(path)
+
+@pytest.fixture
+def sets(tmp_path):
+    a = tmp_path / "A"
+    b = tmp_path / "B"
+    a.mkdir(); b.mkdir()
+    grouped = {
+        "late": [save_jpeg(a / "late.jpg", (300, 200), taken="2024:05:01 10:00:00"),
+                 save_jpeg(b / "late.jpg", (300, 200))],
+        "early": [save_jpeg(a / "early.jpg", (100, 200), taken="2023:01:01 08:00:00"),
+                  save_jpeg(b / "early.jpg", (120, 200))],
+        "big": [save_jpeg(a / "big.jpg", (640, 480)),
+                save_jpeg(b / "big.jpg", (640, 480))],
+    }
+    return [str(a), str(b)], grouped
+
+# --- HEADERS ---
+
+def test_read_header_without_decoding(tmp_path):
+    p = save_jpeg(tmp_path / "x.jpg", (400, 300), orientation=6,
+                  taken="2022:12:24 18:30:00", make="ACME", model="Cam 1")
+    info = read_header(p)
+    # Orientation 6 is displayed rotated, so width and height swap
+    assert (info.width, info.height) == (300, 400)
+    assert info.orientation == 6
+    assert info.camera == "ACME Cam 1"
+    assert info.taken > 0
+    assert info.size == os.path.getsize(p)
+
+def test_read_header_without_exif(tmp_path):
+    p = tmp_path / "plain.png"
+    Image.new("RGB", (10, 20)).save(p)
+    info = read_header(str(p))
+    assert (info.width, info.height, info.orientation, info.taken, info.camera) == (10, 20, 1, 0, "")
+
+# --- INDEX ---
+
+def test_index_persists_and_reuses_records(sets, tmp_path):
+    folders, grouped = sets
+    paths = [p for ps in grouped.values() for p in ps]
+    filepath = str(tmp_path / "index.json")
+
+    index = ScanIndex(folders)
+    assert index.refresh(paths) == len(paths)
+    assert index.save(filepath)[0] is True
+
+    reloaded = ScanIndex.load(folders, filepath)
+    assert reloaded.records == index.records
+    assert reloaded.refresh(paths) == 0
+
+    # A changed file is re-read, a removed one is dropped
+    save_jpeg(grouped["big"][0], (10, 10))
+    st = os.stat(grouped["big"][0])
+    os.utime(grouped["big"][0], ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert reloaded.refresh(paths[1:]) == 1
+    assert reloaded.get(grouped["big"][0]).width == 10
+    assert reloaded.get(paths[0]) is None
+
+def test_arrange_sorts_and_filters(sets):
+    folders, grouped = sets
+    index = ScanIndex(folders)
+    index.refresh([p for ps in grouped.values() for p in ps])
+
+    assert index.arrange(grouped) == ["big", "early", "late"]
+    assert index.arrange(grouped, "Capture time") == ["early", "late", "big"]
+    assert index.arrange(grouped, "Dimensions") == ["big", "late", "early"]
+    assert index.arrange(grouped, "Name", "Portrait") == ["early"]
+    assert index.arrange(grouped, "Name", "Mixed sizes") == ["early"]
+    assert index.arrange(grouped, "Name", "Contains RAW") == []
@@ -0,0 +1,80 @@
+import threading
+import time
+from src.jobs import JobScheduler, PRIORITY_HIGH, PRIORITY_LOW
+
+# --- HELPERS ---
+
+def drain_until(jobs, predicate, timeout=5):
+    deadline = time.time() + timeout
+    while not predicate():
+        assert time.time() < deadline, "timed out"
+        jobs.drain()
+        time.sleep(0.01)
+
+# --- DELIVERY ---
+
+def test_results_are_delivered_on_drain_thread():
+    jobs = JobScheduler(workers=2)
+    seen = []
+    jobs.submit(lambda x: x * 2, 21, on_done=lambda r: seen.append((r, threading.current_thread())))
+    drain_until(jobs, lambda: seen)
+    jobs.shutdown()
+    assert seen == [(42, threading.current_thread())]
+
+def test_errors_go_to_on_error():
+    jobs = JobScheduler(workers=1)
+    errors = []
+    def boom():
+        raise ValueError("nope")
+    jobs.submit(boom, on_done=lambda r: errors.append("done"), on_error=lambda e: errors.append(str(e)))
+    drain_until(jobs, lambda: errors)
+    jobs.shutdown()
+    assert errors == ["nope"]
+
+def test_priority_order_with_busy_worker():
+    jobs = JobScheduler(workers=1)
+    gate = threading.Event()
+    order = []
+    jobs.submit(gate.wait)
+    jobs.submit(order.append, "low", priority=PRIORITY_LOW)
+    jobs.submit(order.append, "high", priority=PRIORITY_HIGH)
+    gate.set()
+    drain_until(jobs, lambda: len(order) == 2)
+    jobs.shutdown()
+    assert order == ["high", "low"]
+
+# --- CANCELLATION ---
+
+def test_cancel_group_skips_queued_and_drops_results():
+    jobs = JobScheduler(workers=1)
+    gate = threading.Event()
+    ran, delivered = [], []
+    blocker = jobs.submit(gate.wait, on_done=delivered.append, group="page")
+    jobs.submit(ran.append, "queued", group="page")
+    keep = jobs.submit(lambda: "other", on_done=delivered.append, group="scan")
+    jobs.cancel("page")
+    gate.set()
+    drain_until(jobs, lambda: delivered)
+    assert blocker.cancelled and not keep.cancelled
+    jobs.shutdown()
+    assert ran == [] and delivered == ["other"]
+
+def test_posted_callbacks_respect_handle():
+    jobs = JobScheduler(workers=1)
+    seen = []
+    handle = jobs.handle("page")
+    jobs.post(seen.append, "before")
+    jobs.post(seen.append, "dropped", job=handle)
+    jobs.cancel("page")
+    jobs.drain()
+    jobs.shutdown()
+    assert seen == ["before"]
+
+def test_finish_runs_queued_work_and_delivers_it():
+    jobs = JobScheduler(workers=1)
+    seen = []
+    for i in range(3):
+        jobs.submit(lambda i: (time.sleep(0.05), i)[1], i, on_done=seen.append)
+    # Unlike shutdown(), nothing queued is dropped and every result is delivered before it returns
+    jobs.finish()
+    assert seen == [0, 1, 2]
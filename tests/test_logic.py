@@ -3,7 +3,8 @@ import pytest
 import random
 import uuid
 import shutil
-from src.logic import FileScanner, AppState, FileManager
+from src.logic import FileScanner, AppState, FileManager, KeyRules, KeyIndex, collapse_duplicates, grid_columns, page_count, page_range, tiles_per_window, visible_region, base_scale, pan_offset
+from src import logic
 
 # --- CONFIGURATION ---
 ITERATIONS = 50
@@ -67,6 +68,147 @@ def test_file_copying(tmp_path):
     assert dest.exists()
     assert dest.read_text() == "content"
 
+def test_copy_file_returns_destination(tmp_path):
+    source = tmp_path / "source.jpg"
+    source.write_text("content")
+    output = tmp_path / "output"
+    output.mkdir()
+    (output / "source.jpg").write_text("taken")
+    destination = FileManager.copy_file(str(source), str(output))
+    # Never overwrites: the second copy gets a new name, which is what gets returned
+    assert destination != str(output / "source.jpg")
+    assert open(destination).read() == "content"
+    with pytest.raises(FileNotFoundError):
+        FileManager.copy_file(str(source), "")
+
+def test_find_duplicates_within_and_across_sets(tmp_path, monkeypatch):
+    # Small sample blocks so the sampled stage and the full-hash stage both run
+    monkeypatch.setattr(logic, "SAMPLE_BLOCK_SIZE", 4)
+    dir_a = tmp_path / "A"
+    dir_b = tmp_path / "B"
+    dir_a.mkdir(); dir_b.mkdir()
+
+    same = b"0123456789" * 10
+    (dir_a / "x.png").write_bytes(same)
+    (dir_b / "x.png").write_bytes(same)
+    (dir_a / "y.png").write_bytes(same)
+    # Same size and same sampled blocks, different middle: only the full hash tells
+    (dir_b / "y.png").write_bytes(same[:30] + b"#" + same[31:])
+    (dir_a / "z.png").write_bytes(b"short")
+    (dir_b / "z.png").write_bytes(b"other")
+
+    grouped, basenames, count, errors = FileScanner.scan([str(dir_a), str(dir_b)])
+    dupes = FileScanner.find_duplicates(grouped)
+
+    canonical = dupes[str(dir_a / "x.png")]
+    assert dupes[str(dir_b / "x.png")] == canonical
+    assert dupes[str(dir_a / "y.png")] == canonical
+    assert str(dir_b / "y.png") not in dupes
+    assert str(dir_a / "z.png") not in dupes
+
+def test_collapse_duplicates_counts_copies():
+    dupes = {"a/1.png": "a/1.png", "b/1.png": "a/1.png", "c/1.png": "a/1.png"}
+    paths, copies = collapse_duplicates(["b/1.png", "d/1.png", "a/1.png", "c/1.png"], dupes)
+    assert paths == ["b/1.png", "d/1.png"]
+    assert copies == {"b/1.png": 3, "d/1.png": 1}
+
+def test_grid_columns_layout_rules():
+    assert [grid_columns(n) for n in (1, 2, 4, 5, 6, 7, 10)] == [1, 2, 2, 3, 3, 4, 4]
+
+def test_paging_covers_every_candidate():
+    total = 23
+    assert page_count(total, 10) == 3
+    slices = [page_range(total, p, 10) for p in range(page_count(total, 10))]
+    assert slices == [(0, 10), (10, 20), (20, 23)]
+    # Out-of-range pages clamp to the last/first page
+    assert page_range(total, 7, 10) == (20, 23)
+    assert page_range(0, 0, 10) == (0, 0)
+
+def test_tiles_are_split_across_windows():
+    # A small set is spread over every window instead of filling only the first
+    assert tiles_per_window(8, 1, 10) == 8
+    assert tiles_per_window(8, 2, 10) == 4
+    assert tiles_per_window(7, 3, 10) == 3
+    # Large sets still page, at most per_page tiles per window
+    assert tiles_per_window(45, 2, 10) == 10
+    assert tiles_per_window(0, 2, 10) == 1
+
+def test_visible_region_crops_to_viewport():
+    # 1000x500 image at 2x on a 400x300 canvas, centred: only the middle is on screen
+    box, pos, size = visible_region(1000, 500, 2.0, 0, 0, 400, 300)
+    assert box == (400, 175, 600, 325)
+    assert size == (400, 300)
+    assert pos == (0, 0)
+
+    # Small image fully visible: whole image, drawn where the full resize would go
+    box, pos, size = visible_region(100, 50, 1.0, 10, -5, 400, 300)
+    assert box == (0, 0, 100, 50)
+    assert pos == (160, 120)
+    assert size == (100, 50)
+
+    # Panned completely off screen
+    assert visible_region(100, 100, 1.0, 1000, 0, 400, 300) is None
+
+def test_base_scale_modes():
+    # A 2500 px preview of a 6000 px RAW next to a 1024 px render on a 500x400 canvas
+    assert base_scale("Fixed", 2500, 1666, 6000, 500, 400) == 0.55
+    assert base_scale("Fit", 2500, 1666, 6000, 500, 400) == pytest.approx(0.2)
+    assert base_scale("Fit", 1024, 1024, 1024, 500, 400) == pytest.approx(400 / 1024)
+    # 1:1 - both end up at one full-resolution pixel per screen pixel
+    assert 2500 * base_scale("1:1", 2500, 1666, 6000, 500, 400) == pytest.approx(6000)
+    assert base_scale("1:1", 1024, 1024, 1024, 500, 400) == 1.0
+    # Canvas not laid out yet / unknown full size: fall back to the fixed scale
+    assert base_scale("Fit", 100, 100, 100, 1, 1) == 0.55
+    assert base_scale("1:1", 100, 100, 0, 500, 400) == 0.55
+
+def test_pan_offset_centres_normalized_point():
+    assert pan_offset((0.5, 0.5), 800, 600) == (0, 0)
+    dx, dy = pan_offset((0.75, 0.25), 800, 600)
+    # The point at 3/4 width, 1/4 height lands in the canvas centre
+    box, pos, size = visible_region(800, 600, 1.0, dx, dy, 400, 300)
+    assert pos[0] + 600 - box[0] == 200 and pos[1] + 150 - box[1] == 150
+
+def test_key_rules_normalize_names():
+    rules = KeyRules(["# ComfyUI counters and edits", "counters", "strip:_edit", r"regex:^(.*?)_v\d+$"])
+    assert rules.key("smile_00001_") == "smile"
+    assert rules.key("smile_00002_") == "smile"
+    assert rules.key("img_edit") == "img"
+    assert rules.key("shot_v3") == "shot"
+    assert rules.key("photo (2)") == "photo"
+    # A name that would vanish keeps itself
+    assert rules.apply(["_0042"]) == ["_0042"]
+    assert not KeyRules([])
+
+def test_key_rules_reject_bad_input():
+    with pytest.raises(ValueError):
+        KeyRules(["regex:(unclosed"])
+    with pytest.raises(ValueError):
+        KeyRules(["shout:loud"])
+
+def test_scanner_groups_with_rules(tmp_path):
+    dir_a = tmp_path / "A"
+    dir_b = tmp_path / "B"
+    dir_a.mkdir(); dir_b.mkdir()
+    (dir_a / "smile_00001_.png").touch()
+    (dir_b / "smile_00002_.png").touch()
+    (dir_a / "img.jpg").touch()
+    (dir_b / "img_edit.jpg").touch()
+
+    grouped, basenames, count, errors = FileScanner.scan([str(dir_a), str(dir_b)])
+    assert grouped == {}
+
+    rules = KeyRules(["counters", "strip:_edit"])
+    grouped, basenames, count, errors = FileScanner.scan([str(dir_a), str(dir_b)], rules)
+    assert basenames == ["img", "smile"]
+    assert len(grouped["smile"]) == 2
+
+def test_key_index_prefix_and_fuzzy():
+    index = KeyIndex(["beach_sunset", "beach_day", "city", "portrait_anna", "portrait_bob"])
+    assert index.prefix("beach") == ["beach_day", "beach_sunset"]
+    assert index.find("PORTRAIT_") == ["portrait_anna", "portrait_bob"]
+    assert index.find("portriat_bob")[0] == "portrait_bob"
+    assert index.find("zzz") == []
+
 # --- PART 2: NEGATIVE TESTS & EDGE CASES ---
 
 def test_ignore_invalid_extensions(tmp_path):
@@ -174,4 +316,32 @@ def test_thorough_chaos(tmp_path):
             success_2, msg_2 = FileManager.copy_to_output(user_choice, str(output_dir))
             assert success_2 is True
 
-    print("\n[Stress Test] COMPLETED SUCCESSFULLY.")
\ No newline at end of file
+    print("\n[Stress Test] COMPLETED SUCCESSFULLY.")
+def test_concurrent_copies_of_same_name_never_overwrite(tmp_path):
+    import threading
+    output = tmp_path / "output"
+    output.mkdir()
+    sources = []
+    for i in range(8):
+        folder = tmp_path / f"src{i}"
+        folder.mkdir()
+        (folder / "pick.jpg").write_text(f"version {i}")
+        sources.append(str(folder / "pick.jpg"))
+
+    destinations = []
+    threads = [threading.Thread(target=lambda s=s: destinations.append(FileManager.copy_file(s, str(output))))
+               for s in sources]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # Every copy got its own file, and every version survived
+    assert len(set(destinations)) == 8
+    assert sorted(open(d).read() for d in destinations) == sorted(f"version {i}" for i in range(8))
+
+def test_failed_copy_leaves_no_partial_file(tmp_path):
+    output = tmp_path / "output"
+    output.mkdir()
+    with pytest.raises(FileNotFoundError):
+        FileManager.copy_file(str(tmp_path / "missing.jpg"), str(output))
+    assert list(output.iterdir()) == []
@@ -0,0 +1,220 @@
+import pytest
+import threading
+import numpy as np
+from PIL import Image
+from src import pipeline
+from src.pipeline import LoadPipeline, PreviewCache, RawBuffers, read_buffer, decode_buffer, decode_raw_preview, downscale_rgb16, make_preview, rgb16_preview
+
+# --- HELPER FIXTURES ---
+
+@pytest.fixture
+def image_files(tmp_path):
+    paths = []
+    for i, size in enumerate([(64, 48), (32, 32), (120, 80)]):
+        p = tmp_path / f"img_{i}.png"
+        Image.new("RGB", size, (i * 40, 10, 200)).save(p)
+        paths.append(str(p))
+    return paths
+
+# --- STAGES ---
+
+def test_read_and_decode_roundtrip(image_files):
+    buf = read_buffer(image_files[0])
+    img = decode_buffer(image_files[0], buf)
+    buf.close()
+    assert img.size == (64, 48)
+    # Fully decoded: pixels are available after the buffer is gone
+    assert img.getpixel((0, 0)) == (0, 10, 200)
+
+def test_read_buffer_uses_mmap_for_large_files(image_files, monkeypatch):
+    monkeypatch.setattr(pipeline, "MMAP_THRESHOLD", 1)
+    buf = read_buffer(image_files[2])
+    assert type(buf).__name__ == "mmap"
+    img = decode_buffer(image_files[2], buf)
+    buf.close()
+    assert img.size == (120, 80)
+
+def test_decode_applies_exif_orientation(tmp_path):
+    p = tmp_path / "rotated.jpg"
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    Image.new("RGB", (40, 20)).save(p, exif=exif)
+    buf = read_buffer(str(p))
+    assert decode_buffer(str(p), buf).size == (20, 40)
+
+def test_make_preview_caps_long_side():
+    img = Image.new("RGB", (400, 100))
+    assert make_preview(img, 200).size == (200, 50)
+    assert make_preview(img, 1000) is img
+
+def test_preview_cache_evicts_least_recently_used():
+    cache = PreviewCache(max_items=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert "b" not in cache
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+# --- RAW PREVIEW PATH ---
+
+def test_downscale_rgb16_box_filters_to_8bit():
+    rgb = np.random.default_rng(1).integers(0, 65536, (101, 203, 3), dtype=np.uint16)
+    out = downscale_rgb16(rgb, 3, RawBuffers())
+    assert out.shape == (33, 67, 4) and out.dtype == np.uint8
+    expected = np.round(rgb[:99, :201].reshape(33, 3, 67, 3, 3).mean(axis=(1, 3)) / 257)
+    assert np.array_equal(out[..., :3], expected)
+    assert (out[..., 3] == 255).all()
+
+def test_downscale_rgb16_factor_one_skips_the_accumulator():
+    rgb = np.random.default_rng(2).integers(0, 65536, (20, 30, 3), dtype=np.uint16)
+    buffers = RawBuffers()
+    out = downscale_rgb16(rgb, 1, buffers)
+    assert np.array_equal(out[..., :3], rgb // 257)
+    assert buffers._acc.size == 0
+
+def test_raw_preview_matches_make_preview_size():
+    # A RAW must come out exactly as large as its JPEG sibling, also for non-integer ratios
+    for w, h, side in ((3000, 2000, 1250), (2000, 1333, 900), (600, 400, 1000)):
+        rgb = np.zeros((h, w, 3), dtype=np.uint16)
+        assert rgb16_preview(rgb, side).size == make_preview(Image.new("RGB", (w, h)), side).size
+
+def test_raw_buffers_are_reused():
+    buffers = RawBuffers()
+    first = buffers.accumulator((40, 40, 3))
+    smaller = buffers.accumulator((10, 20, 3))
+    # Same memory, no new allocation for a file that fits
+    assert np.shares_memory(first, smaller)
+
+def test_decode_raw_preview_is_zero_copy(monkeypatch):
+    class FakeRaw:
+        class sizes:
+            width, height = 4000, 3000
+        def __enter__(self):
+            return self
+        def __exit__(self, *exc):
+            return False
+        def postprocess(self, **kwargs):
+            assert kwargs["half_size"] and kwargs["output_bps"] == 16
+            return np.full((1500, 2000, 3), 65535, dtype=np.uint16)
+
+    monkeypatch.setattr(pipeline.rawpy, "imread", lambda buf: FakeRaw())
+    outputs = []
+    real_downscale = pipeline.downscale_rgb16
+
+    def capture(rgb, factor, buffers=None):
+        outputs.append(real_downscale(rgb, factor, buffers))
+        return outputs[-1]
+
+    monkeypatch.setattr(pipeline, "downscale_rgb16", capture)
+    img = decode_raw_preview(None, 1000)
+    assert img.size == (1000, 750) and img.mode == "RGBA"
+    assert img.getpixel((0, 0)) == (255, 255, 255, 255)
+
+    # The image wraps the downscaled array itself, it was not copied
+    outputs[0][0, 0] = (1, 2, 3, 255)
+    assert img.getpixel((0, 0)) == (1, 2, 3, 255)
+
+    # A second decode on the same thread accumulates in the same scratch buffer
+    acc = pipeline._thread_buffers.value._acc
+    decode_raw_preview(None, 1000)
+    assert np.shares_memory(acc, pipeline._thread_buffers.value._acc)
+
+# --- PIPELINE ---
+
+def test_pipeline_preserves_order_and_postprocesses(image_files):
+    p = LoadPipeline(io_workers=2, decode_workers=2, max_pending=1,
+                     postprocess=lambda img: img.size)
+    try:
+        assert p.load(image_files) == [(64, 48), (32, 32), (120, 80)]
+    finally:
+        p.shutdown()
+
+def test_pipeline_reads_visible_work_before_prefetch(image_files, tmp_path, monkeypatch):
+    import threading
+    gate = threading.Event()
+    real_read = pipeline.read_buffer
+
+    def gated_read(path, use_mmap=True):
+        # Park the only reader on the first file until everything is queued
+        if path == blocker:
+            gate.wait()
+        return real_read(path, use_mmap)
+
+    blocker = str(tmp_path / "blocker.png")
+    Image.new("RGB", (4, 4)).save(blocker)
+    monkeypatch.setattr(pipeline, "read_buffer", gated_read)
+
+    order = []
+    done = threading.Event()
+
+    def record(path, result):
+        order.append(path)
+        if len(order) == 4:
+            done.set()
+
+    p = LoadPipeline(io_workers=1, decode_workers=1)
+    try:
+        p.submit(blocker, record)
+        p.submit(image_files[1], record, priority=pipeline.PRIORITY_PREFETCH)
+        p.submit(image_files[2], record, priority=pipeline.PRIORITY_PREFETCH)
+        p.submit(image_files[0], record)
+        gate.set()
+        assert done.wait(10)
+    finally:
+        p.shutdown()
+    assert order == [blocker, image_files[0], image_files[1], image_files[2]]
+
+def test_pipeline_reports_failures_as_none(image_files, tmp_path):
+    broken = tmp_path / "broken.jpg"
+    broken.write_text("not an image")
+    missing = str(tmp_path / "missing.png")
+
+    p = LoadPipeline()
+    try:
+        results = p.load([image_files[1], str(broken), missing])
+    finally:
+        p.shutdown()
+    assert results[0].size == (32, 32)
+    assert results[1] is None
+    assert results[2] is None
+
+def test_cancelled_requests_are_dropped(image_files, monkeypatch):
+    class Job:
+        cancelled = False
+    job = Job()
+    gate = threading.Event()
+    real_read = pipeline.read_buffer
+
+    def slow_read(path, use_mmap=True):
+        gate.wait(5)
+        return real_read(path, use_mmap)
+
+    monkeypatch.setattr(pipeline, "read_buffer", slow_read)
+    p = LoadPipeline(io_workers=1, decode_workers=1)
+    results = []
+    for path in image_files:
+        p.submit(path, lambda path, img: results.append(path), job=job)
+    job.cancelled = True
+    gate.set()
+    p.shutdown()
+    # Whether a file was still queued or already read, it is never decoded
+    assert results == []
+
+def test_shutdown_drops_queued_work(image_files, monkeypatch):
+    gate = threading.Event()
+    real_read = pipeline.read_buffer
+
+    def slow_read(path, use_mmap=True):
+        gate.wait(5)
+        return real_read(path, use_mmap)
+
+    monkeypatch.setattr(pipeline, "read_buffer", slow_read)
+    p = LoadPipeline(io_workers=1, decode_workers=1)
+    results = []
+    for path in image_files * 4:
+        p.submit(path, lambda path, img: results.append(path))
+    threading.Timer(0.2, gate.set).start()
+    p.shutdown()
+    # Neither the read in flight nor anything queued behind it reaches a callback
+    assert results == []
@@ -0,0 +1,71 @@
+import sqlite3
+import pytest
+from src import session
+from src.session import SessionJournal
+
+# --- HELPER FIXTURES ---
+
+@pytest.fixture
+def journal_path(tmp_path):
+    return str(tmp_path / "cache" / "session.db")
+
+GROUPED = {"a": ["/x/a.jpg", "/y/a.jpg"], "b": ["/x/b.png", "/y/b.png"]}
+
+# --- JOURNAL ---
+
+def test_empty_journal_has_no_session(journal_path):
+    journal = SessionJournal(journal_path)
+    try:
+        assert journal.load() is None
+    finally:
+        journal.close()
+
+def test_session_survives_reopen(journal_path):
+    journal = SessionJournal(journal_path)
+    journal.start(["/x", "/y"], GROUPED, ["a", "b"], {"/y/a.jpg": "/x/a.jpg"})
+    journal.set("current_index", 1)
+    journal.record_selection("a", "/y/a.jpg", "/out/a.jpg")
+    journal.close()
+
+    reopened = SessionJournal(journal_path)
+    try:
+        restored = reopened.load()
+    finally:
+        reopened.close()
+    assert restored["folders"] == ["/x", "/y"]
+    assert restored["grouped_files"] == GROUPED
+    assert restored["sorted_basenames"] == ["a", "b"]
+    assert restored["duplicates"] == {"/y/a.jpg": "/x/a.jpg"}
+    assert restored["current_index"] == 1
+    assert restored["selections"] == {"a": "/y/a.jpg"}
+
+    # Where the copy went is kept as a path, not as status text
+    with sqlite3.connect(journal_path) as db:
+        rows = db.execute("SELECT basename, source, destination FROM selections").fetchall()
+    assert rows == [("a", "/y/a.jpg", "/out/a.jpg")]
+
+def test_writes_are_batched_until_flush(journal_path, monkeypatch):
+    monkeypatch.setattr(session, "FLUSH_INTERVAL", 60)
+    journal = SessionJournal(journal_path)
+    journal.start(["/x"], GROUPED, ["a", "b"])
+    journal.record_selection("b", "/x/b.png", "/out/b.png")
+
+    # Another connection (a crash-restart) sees only what was committed
+    other = SessionJournal(journal_path)
+    assert other.load()["selections"] == {}
+    journal.flush()
+    assert other.load()["selections"] == {"b": "/x/b.png"}
+    other.close()
+    journal.close()
+
+def test_new_scan_forgets_old_selections(journal_path):
+    journal = SessionJournal(journal_path)
+    journal.start(["/x"], GROUPED, ["a", "b"])
+    journal.record_selection("a", "/x/a.jpg", "/out/a.jpg")
+    journal.start(["/z"], {}, ["c"])
+    try:
+        restored = journal.load()
+    finally:
+        journal.close()
+    assert restored["folders"] == ["/z"]
+    assert restored["selections"] == {}
@@ -0,0 +1,62 @@
+import os
+import threading
+import pytest
+from PIL import Image
+from src.thumbnails import ThumbnailCache, ThumbnailService, make_thumbnail
+
+# --- HELPER FIXTURES ---
+
+@pytest.fixture
+def photo(tmp_path):
+    p = tmp_path / "photo.jpg"
+    Image.new("RGB", (800, 400), (200, 30, 30)).save(p, quality=90)
+    return str(p)
+
+# --- THUMBNAILS ---
+
+def test_make_thumbnail_fits_box(photo):
+    thumb = make_thumbnail(photo, size=100)
+    assert thumb.mode == "RGB"
+    assert max(thumb.size) == 100
+    assert thumb.size[0] > thumb.size[1]
+
+def test_make_thumbnail_applies_exif_orientation(tmp_path):
+    p = tmp_path / "rotated.jpg"
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Rotate 90 CW on display
+    Image.new("RGB", (400, 200)).save(p, exif=exif)
+    thumb = make_thumbnail(str(p), size=100)
+    assert thumb.size[1] > thumb.size[0]
+
+def test_cache_roundtrip_and_invalidation(photo, tmp_path):
+    cache = ThumbnailCache(cache_dir=str(tmp_path / "cache"), size=64)
+    assert cache.get(photo) is None
+
+    cache.put(photo, make_thumbnail(photo, 64))
+    assert cache.get(photo).size == (64, 32)
+
+    # Touching the source file gives it a new cache key
+    st = os.stat(photo)
+    os.utime(photo, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert cache.get(photo) is None
+
+def test_service_fills_memory_and_disk(photo, tmp_path):
+    ready = []
+    done = threading.Event()
+
+    def on_ready(path):
+        ready.append(path)
+        done.set()
+
+    cache = ThumbnailCache(cache_dir=str(tmp_path / "cache"), size=48)
+    service = ThumbnailService(on_ready=on_ready, cache=cache, workers=1)
+    try:
+        assert service.get(photo) is None
+        service.request([photo])
+        assert done.wait(10)
+    finally:
+        service.shutdown()
+
+    assert ready == [photo]
+    assert service.get(photo).size == (48, 24)
+    assert cache.get(photo) is not None
@@ -0,0 +1,104 @@
+import threading
+from PIL import Image
+from src.tiles import TileCache, TileLoader, tiles_for
+
+# --- HELPERS ---
+
+def gradient(w, h):
+    img = Image.new("RGB", (w, h))
+    img.putdata([(x % 256, y % 256, (x + y) % 256) for y in range(h) for x in range(w)])
+    return img
+
+def loader_for(img, **kwargs):
+    done = threading.Event()
+    calls = []
+    def decode(path):
+        calls.append(path)
+        return img
+    loader = TileLoader(on_ready=lambda p: done.set(), decode=decode, tile=16, **kwargs)
+    return loader, done, calls
+
+# --- TILE GRID ---
+
+def test_tiles_for_covers_box():
+    assert tiles_for((0, 0, 16, 16), 16) == [(0, 0)]
+    assert tiles_for((10, 5, 40, 17), 16) == [(0, 0), (1, 0), (2, 0), (0, 1), (1, 1), (2, 1)]
+
+# --- CACHE ---
+
+def test_cache_evicts_by_bytes():
+    cache = TileCache(max_bytes=3 * 16 * 16 * 3)
+    for i in range(4):
+        cache.put(i, Image.new("RGB", (16, 16)))
+    assert 0 not in cache and len(cache) == 3
+    cache.get(1)
+    cache.put(4, Image.new("RGB", (16, 16)))
+    assert 1 in cache and 2 not in cache
+
+def test_shrinking_budget_evicts_at_once():
+    tile_bytes = 16 * 16 * 3
+    cache = TileCache(max_bytes=4 * tile_bytes)
+    for i in range(4):
+        cache.put(i, Image.new("RGB", (16, 16)))
+    cache.resize(2 * tile_bytes)
+    # No put needed: the oldest tiles go as soon as the budget drops
+    assert len(cache) == 2 and cache.used_bytes == 2 * tile_bytes
+    assert 2 in cache and 3 in cache
+
+# --- LOADER ---
+
+def test_assemble_matches_full_image():
+    img = gradient(50, 40)
+    loader, done, calls = loader_for(img)
+    box = (5, 7, 45, 39)
+    assert loader.assemble("a", box) is None
+    loader.request("a", box)
+    assert done.wait(5)
+    loader.shutdown(wait=True)
+    assert loader.sizes["a"] == (50, 40)
+    assert list(loader.assemble("a", box).getdata()) == list(img.crop(box).getdata())
+    assert list(loader.assemble("a", (17, 17, 20, 20)).getdata()) == list(img.crop((17, 17, 20, 20)).getdata())
+
+def test_share_keeps_tiles_nearest_viewport():
+    img = gradient(160, 160)                   # 10 x 10 tiles of 16 px
+    loader, done, _ = loader_for(img)
+    box = (64, 64, 96, 96)                     # The 2 x 2 tiles at the centre
+    loader.request("a", box, share=9 * 16 * 16 * 3)
+    assert done.wait(5)
+    loader.shutdown(wait=True)
+    assert len(loader.cache) == 9
+    assert loader.assemble("a", box) is not None
+    assert ("a", 0, 0) not in loader.cache
+
+def test_failed_decode_is_not_retried():
+    calls = []
+    done = threading.Event()
+    def decode(path):
+        calls.append(path)
+        raise OSError("broken")
+    loader = TileLoader(on_ready=lambda p: done.set(), decode=decode)
+    loader.request("bad", (0, 0, 10, 10))
+    assert done.wait(5)
+    loader.shutdown(wait=True)
+    loader.request("bad", (0, 0, 10, 10))
+    assert calls == ["bad"] and not loader.busy()
+
+def test_cancelled_requests_are_not_decoded():
+    class Job:
+        cancelled = False
+    gate = threading.Event()
+    calls = []
+    def decode(path):
+        calls.append(path)
+        gate.wait(5)
+        return gradient(32, 32)
+    loader = TileLoader(decode=decode, workers=1)
+    skipped, current = Job(), Job()
+    loader.request("busy", (0, 0, 10, 10), job=current)
+    loader.request("old", (0, 0, 10, 10), job=skipped)
+    loader.request("new", (0, 0, 10, 10), job=current)
+    skipped.cancelled = True
+    gate.set()
+    loader.shutdown(wait=True)
+    # The file of the skipped set never reaches the decoder
+    assert calls == ["busy", "new"] and not loader.busy()